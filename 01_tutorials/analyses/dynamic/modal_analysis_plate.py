@@ -12,9 +12,15 @@ Steps:
 3. Set boundary conditions at both ends of the plate.
 4. Define a modal analysis problem.
 5. Run the analysis and visualize the mode shapes.
+6. Assemble the mode-shape matrix and compute the modal quantities.
 """
 
 import os
+import sqlite3
+import weakref
+from contextlib import closing
+
+import numpy as np
 
 from compas.datastructures import Mesh
 from compas_gmsh.models import MeshModel
@@ -39,6 +45,123 @@ compas_fea2.set_backend("compas_fea2_opensees")
 HERE = os.path.dirname(__file__)
 TEMP = os.path.join(HERE, "..", "..", "..", "temp")
 
+# Lumped masses of each part: (signature, masses). The entries are dropped
+# together with their parts.
+_MASS_CACHE = weakref.WeakKeyDictionary()
+
+
+# ==============================================================================
+# Mass assembly
+# ==============================================================================
+def _element_measures(xyz, connectivity, section):
+    """Length, area or volume of a group of elements sharing the same section.
+
+    Beams (2 nodes) return length * A, shells (3 or 4 nodes with a thickness)
+    return area * t and tetrahedra (4 nodes) return their volume.
+    """
+    p = xyz[connectivity]
+    if connectivity.shape[1] == 2:
+        return np.linalg.norm(p[:, 1] - p[:, 0], axis=1) * section.A
+    if hasattr(section, "t"):
+        area = 0.5 * np.linalg.norm(np.cross(p[:, 1] - p[:, 0], p[:, 2] - p[:, 0]), axis=1)
+        if connectivity.shape[1] == 4:
+            area += 0.5 * np.linalg.norm(np.cross(p[:, 2] - p[:, 0], p[:, 3] - p[:, 0]), axis=1)
+        return area * section.t
+    if connectivity.shape[1] == 4:
+        return np.abs(np.einsum("ij,ij->i", p[:, 1] - p[:, 0], np.cross(p[:, 2] - p[:, 0], p[:, 3] - p[:, 0]))) / 6
+    raise ValueError(f"Elements with {connectivity.shape[1]} nodes are not supported.")
+
+
+def lumped_masses(part):
+    """Lumped nodal masses of a part, from element measures times section density.
+
+    The elements are grouped by section and number of nodes, and the mass of
+    each group is computed at once and split equally among the element nodes.
+    The result is cached per part and recomputed when the number of nodes or
+    elements change, or when the sections change (density, area or thickness).
+    Moving nodes does not change this signature: call :func:`invalidate_masses`
+    after changing the geometry of a part.
+
+    Parameters
+    ----------
+    part : :class:`compas_fea2.model.Part`
+
+    Returns
+    -------
+    numpy.ndarray
+        The mass of each node, in the order of ``part.nodes``.
+    """
+    signature = (
+        len(part.nodes),
+        len(part.elements),
+        frozenset(
+            (id(section), section.material.density, getattr(section, "A", None), getattr(section, "t", None))
+            for section in part.sections
+        ),
+    )
+    cached = _MASS_CACHE.get(part)
+    if cached is None or cached[0] != signature:
+        cached = (signature, _lumped_masses(part))
+        _MASS_CACHE[part] = cached
+    return cached[1]
+
+
+def invalidate_masses(part):
+    """Discard the cached masses of a part (e.g. after moving its nodes)."""
+    _MASS_CACHE.pop(part, None)
+
+
+def _lumped_masses(part):
+    nodes = list(part.nodes)
+    elements = list(part.elements)
+    node_index = {node: i for i, node in enumerate(nodes)}
+    xyz = np.array([node.xyz for node in nodes])
+    groups = {}
+    for element in elements:
+        key = (id(element.section), len(element.nodes))
+        groups.setdefault(key, (element.section, []))[1].append([node_index[n] for n in element.nodes])
+
+    masses = np.zeros(len(nodes))
+    for section, connectivity in groups.values():
+        connectivity = np.asarray(connectivity)
+        element_mass = _element_measures(xyz, connectivity, section) * section.material.density
+        np.add.at(masses, connectivity, (element_mass / connectivity.shape[1])[:, None])
+    return masses
+
+
+def mode_shape_array(stp, mode, part):
+    """Translational components of a mode shape at the nodes of a part.
+
+    The rows of the mode are read from the results database as one array and
+    placed by node key, without creating a result object per node.
+
+    Returns
+    -------
+    numpy.ndarray
+        (n_nodes, 3) array, in the order of ``part.nodes``.
+    """
+    shape = stp.mode_shape(mode)
+    columns = ", ".join(["key"] + list(shape.components_names)[:3])
+    with closing(sqlite3.connect(stp.problem.path_db)) as connection:
+        table_columns = {row[1] for row in connection.execute(f"PRAGMA table_info({shape.field_name})")}
+        query = f"SELECT {columns} FROM {shape.field_name} WHERE step = ? AND part = ?"
+        parameters = [shape.step.name, part.name]
+        if "mode" in table_columns:
+            query += " AND mode = ?"
+            parameters.append(mode)
+        data = np.asarray(connection.execute(query, parameters).fetchall(), dtype=np.float64)
+
+    keys = np.array([node.key for node in part.nodes], dtype=np.int64)
+    order = np.argsort(keys)
+    sorted_keys = keys[order]
+    rows = data[:, 0].astype(np.int64)
+    pos = np.minimum(np.searchsorted(sorted_keys, rows), len(keys) - 1)
+    found = sorted_keys[pos] == rows
+    values = np.zeros((len(keys), 3))
+    values[order[pos[found]]] = data[found, 1:]
+    return values
+
+
 # ==============================================================================
 # Step 1: Define the plate geometry
 # ==============================================================================
@@ -68,9 +191,11 @@ sec = SolidSection(material=mat)
 prt = Part.from_gmsh(gmshModel=model, section=sec)
 mdl.add_part(prt)
 
-# Assign mass to nodes for modal analysis
-for n in prt.nodes:
-    n.mass = [1.0, 1.0, 1.0, 0.0, 0.0, 0.0]
+# Assign the lumped masses to the nodes for modal analysis
+nodal_mass = lumped_masses(prt)
+for node, m in zip(prt.nodes, nodal_mass):
+    node.mass = [m, m, m, 0.0, 0.0, 0.0]
+print(f"Total mass of the plate: {nodal_mass.sum():.4e}")
 
 # ==============================================================================
 # Step 3: Set boundary conditions at both ends of the plate
@@ -91,3 +216,51 @@ prb.analyse_and_extract(path=TEMP, output=True)
 viewer = ModelViewer(mdl, shape=(2, 2))
 viewer.add_mode_shapes(list(stp.shapes)[:3], sf=1000)
 viewer.show()
+
+# ==============================================================================
+# Step 6: Assemble the mode-shape matrix and compute the modal quantities
+# ==============================================================================
+# The translational DOFs of all nodes are stored in a single (n_dof, n_modes)
+# matrix. The matrix is memory-mapped to disk and filled one mode at a time,
+# so only one mode shape is loaded from the results database at any moment,
+# as an array.
+nodes = list(prt.nodes)
+n_dof = 3 * len(nodes)
+n_modes = stp.modes
+
+modes_matrix = np.lib.format.open_memmap(
+    os.path.join(TEMP, f"{prb.name}_modes.npy"),
+    mode="w+",
+    dtype=np.float64,
+    shape=(n_dof, n_modes),
+)
+frequencies = np.zeros(n_modes)
+for mode in range(1, n_modes + 1):
+    modes_matrix[:, mode - 1] = mode_shape_array(stp, mode, prt).reshape(-1)
+    frequencies[mode - 1] = stp.mode_frequency(mode)
+modes_matrix.flush()
+
+# Lumped (diagonal) mass matrix of the translational DOFs
+mass = np.repeat(lumped_masses(prt), 3)
+
+# Mass normalization: phi_i^T M phi_i = 1
+modal_mass = np.einsum("ij,i,ij->j", modes_matrix, mass, modes_matrix)
+modes_matrix /= np.sqrt(modal_mass)
+
+# Participation factors and effective masses for rigid-body motion in x, y, z
+influence = np.zeros((n_dof, 3))
+for d in range(3):
+    influence[d::3, d] = 1.0
+participation = modes_matrix.T @ (mass[:, None] * influence)  # (n_modes, 3)
+effective_mass = participation**2
+total_mass = mass.reshape(-1, 3).sum(axis=0)
+
+print(" mode |  f [Hz]  |  Gx  |  Gy  |  Gz  | Meff,x % | Meff,y % | Meff,z %")
+for i in range(n_modes):
+    print(
+        f"{i + 1:5d} | {frequencies[i]:8.3f} | "
+        + " | ".join(f"{g:4.2f}" for g in participation[i])
+        + " | "
+        + " | ".join(f"{100 * m:8.2f}" for m in effective_mass[i] / total_mass)
+    )
+print("Cumulative effective mass [%]: ", 100 * effective_mass.sum(axis=0) / total_mass)
@@ -0,0 +1,126 @@
+"""
+Tutorial: Influence lines with many load patterns
+
+An influence study applies the same unit load at many positions on the same
+linear structure, and collects the N displacement fields into one stacked
+array.
+
+Each load position is a separate problem with a single step. With CalculiX
+(and Abaqus) the loads of a step are kept in the following steps of the same
+problem, so the positions cannot be steps of one problem. All the problems are
+submitted with one call, but each one is a separate linear solve: the
+stiffness matrix is factorized once per load position.
+
+Steps:
+1. Define a simply supported beam.
+2. Add one problem per load position.
+3. Run the analyses.
+4. Check the equilibrium of every load case, stack the displacement fields and
+   extract the influence line.
+5. Check the result with Maxwell's reciprocal theorem and with the theory.
+"""
+
+import os
+
+import numpy as np
+from compas.geometry import Point, Line
+
+import compas_fea2
+from compas_fea2.model import Model, Part
+from compas_fea2.model import ElasticIsotropic, BeamElement, RectangularSection
+from compas_fea2.problem import (
+    Problem,
+    StaticStep,
+    LoadCombination,
+)
+from compas_fea2.results import DisplacementFieldResults, ReactionFieldResults
+from compas_fea2.units import units
+
+# Set the backend implementation
+# compas_fea2.set_backend("compas_fea2_opensees")
+compas_fea2.set_backend("compas_fea2_calculix")
+# compas_fea2.set_backend("compas_fea2_abaqus")
+# compas_fea2.set_backend("compas_fea2_castem")
+# compas_fea2.set_backend('compas_fea2_sofistik')
+
+HERE = os.path.dirname(__file__)
+TEMP = os.path.join(HERE, "..", "..", "..", "temp")
+
+units = units(system="SI_mm")
+
+# ==============================================================================
+# Step 1: Simply supported beam
+# ==============================================================================
+mdl = Model(name="influence_lines")
+
+lx = 5000
+p1 = Point(0, 0, 0)
+p2 = Point(lx, 0, 0)
+
+mat = ElasticIsotropic(E=10 * units("GPa"), v=0.2, density=2500 * units("kg/m**3"))
+sec = RectangularSection(w=12 * units.cm, h=10 * units.cm, material=mat)
+
+prt = Part.from_compas_lines_discretized(
+    lines=[Line(p1, p2)], targetlength=250, element_class=BeamElement, section=sec, frame=[0, 1, 0]
+)
+mdl.add_part(prt)
+
+mdl.add_pin_bc(nodes=prt.find_closest_nodes_to_point(p1))
+mdl.add_pin_bc(nodes=prt.find_closest_nodes_to_point(p2))
+
+# ==============================================================================
+# Step 2: One load pattern (problem) per load position
+# ==============================================================================
+nodes = sorted(prt.nodes, key=lambda n: n.x)
+positions = nodes[1:-1]  # the supports do not need a load pattern
+x = np.array([n.x for n in nodes])
+
+problems = []
+steps = []  # steps[i] carries the load at positions[i]
+for i, node in enumerate(positions):
+    prb = mdl.add_problem(problem=Problem(name=f"influence_lines-{i}"))
+    stp = prb.add_step(StaticStep(name=f"position-{i}"))
+    stp.combination = LoadCombination.SLS()
+    stp.add_uniform_node_load(nodes=[node], z=-1 * units.kN, load_case="LL")
+    stp.add_outputs([DisplacementFieldResults, ReactionFieldResults])
+    problems.append(prb)
+    steps.append(stp)
+
+# ==============================================================================
+# Step 3: Analyses of all the load patterns
+# ==============================================================================
+mdl.analyse_and_extract(problems=problems, path=TEMP, verbose=True)
+
+# ==============================================================================
+# Step 4: Stack the N displacement fields: (n_patterns, n_nodes, 3)
+# ==============================================================================
+# Equilibrium: the supports of every load case carry exactly one unit load
+P = (1 * units.kN).to_base_units().magnitude
+for stp in steps:
+    reaction = sum(stp.reaction_field.get_result_at(node).z for node in (nodes[0], nodes[-1]))
+    if not np.isclose(reaction, P, rtol=1e-6):
+        raise RuntimeError(f"Load case {stp.name}: total reaction {reaction} instead of {P}.")
+
+displacements = np.empty((len(positions), len(nodes), 3))
+for i, stp in enumerate(steps):
+    field = stp.displacement_field
+    displacements[i] = [[r.x, r.y, r.z] for r in map(field.get_result_at, nodes)]
+
+# Influence line of the mid-span deflection: deflection at mid-span for the
+# unit load placed at each position
+mid = int(np.argmin(np.abs(x - lx / 2)))
+influence_line = displacements[:, mid, 2]
+
+# ==============================================================================
+# Step 5: Verification
+# ==============================================================================
+# Maxwell: the influence line of the mid-span deflection equals the deflected
+# shape of the beam under the load at mid-span
+deflected_shape = displacements[mid - 1, 1:-1, 2]
+print("Max reciprocity error [mm]: ", np.abs(influence_line - deflected_shape).max())
+
+# Theory: deflection at mid-span for a point load P at distance a from the support
+a = np.minimum(x[1:-1], lx - x[1:-1])
+w_th = -P * a * (3 * lx**2 - 4 * a**2) / (48 * mat.E * sec.Ixx)
+for xi, w, wt in zip(x[1:-1], influence_line, w_th):
+    print(f"x = {xi:7.1f} mm   FEA: {w:9.4f} mm   theory: {wt:9.4f} mm")
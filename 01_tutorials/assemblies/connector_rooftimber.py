@@ -1,6 +1,10 @@
 import compas_fea2
 import os
 
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
 from compas.geometry import Frame, Point, Line
 
 from compas_fea2.model import Model, RectangularSection, ElasticIsotropic, RigidLinkConnector, BeamElement, Part
@@ -109,6 +113,74 @@ mdl.add_parts(parts)
 mdl.add_pin_bc(nodes=[parts[0].find_closest_nodes_to_point(p00, 1).sorted[0]])
 
 
+# Bulk connection of the parts
+def connect_parts(mdl, parts, pairs="auto", tol=1.0, connector_type=RigidLinkConnector, **kwargs):
+    """
+    Connect the coincident (or near-coincident) nodes of different parts.
+
+    All the nodes of the parts are searched at once with a KD-tree, so the
+    cost does not depend on the number of joints.
+    With ``pairs="auto"`` the nodes closer than ``tol`` are grouped in joints
+    and, in each joint, the node of the first part is linked to the nodes of
+    the other parts (one connector less than the parts meeting at the joint,
+    so no redundant link is created).
+    With an explicit list of part pairs ``(i, j)``, only the coincident nodes
+    of those pairs are linked, with the connector node created on part ``i``.
+
+    Parameters
+    ----------
+    mdl : :class: compas_fea2.model.Model
+            The model of the parts.
+    parts : list
+            The parts to connect.
+    pairs : list of tuple or str (optional)
+            Indices of the parts to connect, or "auto" to connect all the parts.
+    tol : float (optional)
+            Maximum distance between the nodes of a joint.
+    connector_type : class (optional)
+            The connector to create, by default RigidLinkConnector.
+    **kwargs :
+            Further arguments of the connector (e.g. dofs).
+
+    Returns
+    -------
+    list
+        The connectors added to the model.
+
+    """
+    part_nodes = [list(part.nodes) for part in parts]
+    nodes = [node for p_nodes in part_nodes for node in p_nodes]
+    owner = np.repeat(np.arange(len(parts)), [len(p_nodes) for p_nodes in part_nodes])
+    xyz = np.array([node.xyz for node in nodes], dtype=np.float64)
+
+    found = cKDTree(xyz).query_pairs(tol, output_type="ndarray")
+    found = found[owner[found[:, 0]] != owner[found[:, 1]]]
+
+    if isinstance(pairs, str) and pairs == "auto":
+        # joints: connected groups of coincident nodes, sorted by part
+        graph = coo_matrix((np.ones(len(found)), (found[:, 0], found[:, 1])), shape=(len(nodes), len(nodes)))
+        _, labels = connected_components(graph, directed=False)
+        linked = np.unique(found)
+        linked = linked[np.lexsort((owner[linked], labels[linked]))]
+        first = np.r_[True, labels[linked][1:] != labels[linked][:-1]]
+        centres = linked[np.maximum.accumulate(np.where(first, np.arange(len(linked)), 0))]
+        keep = owner[centres] != owner[linked]
+        links = np.column_stack([centres[keep], linked[keep]])
+    else:
+        keys = np.array([i * len(parts) + j for i, j in pairs])
+        pa, pb = owner[found[:, 0]], owner[found[:, 1]]
+        forward = np.isin(pa * len(parts) + pb, keys)
+        backward = np.isin(pb * len(parts) + pa, keys)
+        links = np.concatenate([found[forward], found[backward][:, ::-1]])
+
+    connectors = []
+    for i, j in links:
+        connector = connector_type(nodes=parts[owner[i]].create_connector_node(nodes[j]), **kwargs)
+        mdl.add_connector(connector)
+        connectors.append(connector)
+    return connectors
+
+
 # Definition of the connection between the parts
 #creation of a list with information connections
 connection_data= [
@@ -124,9 +196,9 @@ connection_data= [
     [3,         5,          p24],           #right strut/right rafter
 ]
 
-for data in connection_data :
-    connector = parts[data[0]].create_connector_node(parts[data[1]].find_closest_nodes_to_point(data[2], 1).sorted[0])
-    mdl.add_connector(RigidLinkConnector(nodes=connector, dofs="beam"))
+# The pairs of parts of the table are connected at their coincident nodes.
+# With pairs="auto" all the joints would be found without the table.
+connect_parts(mdl, parts, pairs=[(data[0], data[1]) for data in connection_data], tol=1.0, dofs="beam")
 
 # Set boundary conditions and insure out-of-plane stability
 mdl.add_pin_bc(nodes=[parts[0].find_closest_nodes_to_point(p00, 1).sorted[0]])
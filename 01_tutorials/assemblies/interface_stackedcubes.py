@@ -1,5 +1,8 @@
 import os
+import json
+import hashlib
 
+import numpy as np
 from compas.geometry import Box, Vector, Translation
 
 from compas_gmsh.models import ShapeModel
@@ -23,6 +26,114 @@ TEMP = os.path.join(HERE, "..", "temp")
 
 mdl = Model(name="stacked_cubes")
 
+
+def _face_triangles(faces):
+    """Vertices (m, 3, 3), unit normals (m, 3) and plane offsets (m,) of faces."""
+    if any(len(f.nodes) != 3 for f in faces):
+        raise ValueError("Interface detection is implemented for triangular faces only")
+    xyz = np.array([[node.xyz for node in f.nodes] for f in faces], dtype=np.float64)
+    normals = np.array([f.normal for f in faces], dtype=np.float64)
+    normals /= np.linalg.norm(normals, axis=1)[:, None]
+    offsets = np.einsum("ij,ij->i", normals, xyz[:, 0])
+    return xyz, normals, offsets
+
+
+def _triangles_overlap(ta, tb, tol):
+    """Separating axis test between pairs of 2D triangles (p, 3, 2).
+
+    Two triangles overlap if their projections on every edge normal of both
+    triangles overlap by more than ``tol``, so that triangles touching only
+    along an edge or at a vertex do not match.
+    """
+    triangles = np.concatenate([ta, tb], axis=1)  # (p, 6, 2)
+    edges = np.concatenate([np.roll(ta, -1, axis=1) - ta, np.roll(tb, -1, axis=1) - tb], axis=1)
+    axes = np.stack([-edges[..., 1], edges[..., 0]], axis=-1)
+    axes /= np.linalg.norm(axes, axis=-1)[..., None]
+    projections = np.einsum("pkd,pvd->pkv", axes, triangles)  # (p, 6 axes, 6 vertices)
+    pa, pb = projections[..., :3], projections[..., 3:]
+    overlap = np.minimum(pa.max(axis=-1), pb.max(axis=-1)) - np.maximum(pa.min(axis=-1), pb.min(axis=-1))
+    return np.all(overlap > tol, axis=1)
+
+
+def interface_from_parts(part_a, part_b, behavior, tol=1e-3, normal_tol=1e-3):
+    """Create the interface between the coincident faces of two parts.
+
+    The meshes of the two parts do not need to be conforming. The faces of
+    ``part_a`` are grouped by plane, and for each plane the faces of
+    ``part_b`` with an opposed normal (within ``normal_tol``) and an offset
+    within ``tol`` are selected. Two faces match if their triangles overlap
+    in the plane: the candidate pairs are found from their bounding
+    rectangles and checked with a separating axis test. The part with the
+    denser mesh on the interface is the slave.
+
+    Parameters
+    ----------
+    part_a, part_b : :class:`compas_fea2.model.Part`
+    behavior : :class:`compas_fea2.model.Interaction`
+        The behavior of the interface.
+    tol : float, optional
+        Maximum distance between the planes of matching faces, and minimum
+        overlap of their triangles.
+    normal_tol : float, optional
+        Tolerance on the dot product of the normals (-1 for opposed faces).
+
+    Returns
+    -------
+    :class:`compas_fea2.model.Interface` | None
+        The interface, or None if the parts have no coincident faces.
+
+    Raises
+    ------
+    ValueError
+        If the faces of the parts are not triangles.
+    """
+    faces_a, faces_b = list(part_a.faces), list(part_b.faces)
+    xyz_a, na, da = _face_triangles(faces_a)
+    xyz_b, nb, db = _face_triangles(faces_b)
+
+    # planes of part_a, from the rounded normals and offsets
+    plane_keys = np.column_stack([np.round(na / normal_tol), np.round(da / tol)])
+    _, plane_of_face = np.unique(plane_keys, axis=0, return_inverse=True)
+    plane_of_face = plane_of_face.ravel()
+
+    matches_a, matches_b = set(), set()
+    for plane in range(plane_of_face.max() + 1):
+        ia = np.flatnonzero(plane_of_face == plane)
+        normal = na[ia].mean(axis=0)
+        normal /= np.linalg.norm(normal)
+        offset = da[ia].mean()
+        ib = np.flatnonzero((nb @ normal <= -1 + normal_tol) & (np.abs(db + offset) <= tol))
+        if len(ib) == 0:
+            continue
+
+        # in-plane coordinates
+        u = np.cross(normal, np.eye(3)[np.argmin(np.abs(normal))])
+        u /= np.linalg.norm(u)
+        basis = np.stack([u, np.cross(normal, u)], axis=1)  # (3, 2)
+        ta, tb = xyz_a[ia] @ basis, xyz_b[ib] @ basis
+
+        # broad phase: overlapping bounding rectangles
+        lo_a, hi_a = ta.min(axis=1), ta.max(axis=1)
+        lo_b, hi_b = tb.min(axis=1), tb.max(axis=1)
+        boxes = np.all((lo_a[:, None] < hi_b[None] - tol) & (lo_b[None] < hi_a[:, None] - tol), axis=-1)
+        pa, pb = np.nonzero(boxes)
+
+        # narrow phase: overlapping triangles
+        overlap = _triangles_overlap(ta[pa], tb[pb], tol)
+        matches_a.update(ia[pa[overlap]].tolist())
+        matches_b.update(ib[pb[overlap]].tolist())
+    if not matches_a:
+        return None
+
+    selected_a = {faces_a[i] for i in matches_a}
+    selected_b = {faces_b[j] for j in matches_b}
+    group_a = part_a.faces.subgroup(lambda f: f in selected_a)
+    group_b = part_b.faces.subgroup(lambda f: f in selected_b)
+    if len(selected_a) >= len(selected_b):
+        return Interface(master=group_b, slave=group_a, behavior=behavior)
+    return Interface(master=group_a, slave=group_b, behavior=behavior)
+
+
 # ==============================================================================
 # MODEL 
 # ==============================================================================
@@ -68,11 +179,12 @@ for i in range(1,n_cubes):
 # Behaviour law for the inteface
 interaction=HardContactFrictionPenalty(mu=30, stiffness=1e7, tolerance=1)
 
-# Behaviour law for the inteface
+# Interfaces between the coincident faces of consecutive cubes
+INTERFACE_TOL = 1e-3 * h
 for i in range(1,len(parts)):
-    slave_face = parts[i-1].faces.subgroup(lambda n: n.centroid[2] == i*h)
-    master_face = parts[i].faces.subgroup(lambda n: n.centroid[2] == i*h)
-    interface=Interface(master=master_face, slave=slave_face, behavior=interaction)
+    interface = interface_from_parts(parts[i-1], parts[i], behavior=interaction, tol=INTERFACE_TOL)
+    if interface is None:
+        raise ValueError(f"No coincident faces between {parts[i-1].name} and {parts[i].name}")
     mdl.add_interface(interface)
 
 # Boundaries condition
@@ -84,11 +196,13 @@ mdl.add_fix_bc(nodes=fixed_nodes)
 # ==============================================================================
 # static step and combination
 prb = mdl.add_problem(name="SLS")
-stp = prb.add_static_step(load_step=0.05, min_inc_size=0.1)
+STEP_SETTINGS = dict(load_step=0.05, min_inc_size=0.1)
+stp = prb.add_static_step(**STEP_SETTINGS)
 stp.combination = LoadCombination.SLS()
 
 # loads : only the top cube is loaded with compression
-stp.add_uniform_node_load(nodes=parts[-1].nodes.subgroup(lambda n: n.z == n_cubes*h), z=-10 * units.kN, load_case="LL")
+LOAD = -10 * units.kN
+stp.add_uniform_node_load(nodes=parts[-1].nodes.subgroup(lambda n: n.z == n_cubes*h), z=LOAD, load_case="LL")
 
 # define the outputs
 stp.add_outputs(
@@ -98,7 +212,74 @@ stp.add_outputs(
 # ==============================================================================
 # ANALYSIS
 # ==============================================================================
-mdl.analyse_and_extract(problems=[prb], path=TEMP, output=True, max_increments=10, min_inc_size=0.01)
+# Contact analyses can run for a long time. After an analysis that completed
+# successfully, a marker file with a fingerprint of the model and of the
+# analysis is written next to the results database. With REUSE_RESULTS = True
+# the results of that analysis are re-read instead of running it again, but
+# only if the marker exists and the fingerprint matches: results of a failed
+# run or of a different model or analysis are never reused.
+# This is not a restart: an analysis that failed (e.g. at 90% of the load) is
+# run again from the beginning, since restarting from the last converged
+# increment (*RESTART) is not implemented.
+REUSE_RESULTS = False
+ANALYSIS_SETTINGS = dict(max_increments=10, min_inc_size=0.01)
+PATH = os.path.join(TEMP, prb.name)
+prb.path = PATH
+MARKER = os.path.join(PATH, f"{prb.name}-completed.json")
+
+
+def model_fingerprint(parts, *parameters):
+    """Hash of the node coordinates, the element connectivity and the parameters."""
+    digest = hashlib.sha256()
+    for part in parts:
+        nodes = list(part.nodes)
+        node_index = {node: i for i, node in enumerate(nodes)}
+        digest.update(np.array([node.xyz for node in nodes], dtype=np.float64).tobytes())
+        for element in part.elements:
+            digest.update(np.array([node_index[n] for n in element.nodes], dtype=np.int64).tobytes())
+    digest.update(repr(parameters).encode())
+    return digest.hexdigest()
+
+
+fingerprint = model_fingerprint(
+    parts,
+    (mat.E, mat.v, mat.density),
+    (interaction.mu, interaction.stiffness, interaction.tolerance, INTERFACE_TOL),
+    ("fixed", sorted(node.key for node in fixed_nodes)),
+    (n_cubes, LOAD),
+    sorted(STEP_SETTINGS.items()),
+    sorted(ANALYSIS_SETTINGS.items()),
+)
+
+
+def analysis_completed():
+    """True if the solver reports a successful analysis (Abaqus status file)."""
+    status = os.path.join(PATH, f"{prb.name}.sta")
+    if not os.path.exists(status):
+        return False
+    with open(status) as f:
+        return "THE ANALYSIS HAS COMPLETED SUCCESSFULLY" in f.read()
+
+
+def reusable_results():
+    if not (os.path.exists(MARKER) and os.path.exists(prb.path_db)):
+        return False
+    with open(MARKER) as f:
+        return json.load(f).get("fingerprint") == fingerprint
+
+
+if REUSE_RESULTS and reusable_results():
+    print(f"Re-reading the completed analysis in {PATH}")
+    prb.extract_results(path=PATH)
+else:
+    if os.path.exists(MARKER):
+        os.remove(MARKER)
+    mdl.analyse_and_extract(problems=[prb], path=PATH, output=True, **ANALYSIS_SETTINGS)
+    if analysis_completed():
+        with open(MARKER, "w") as f:
+            json.dump({"fingerprint": fingerprint}, f)
+    else:
+        print(f"The analysis in {PATH} did not complete: its results will not be reused")
 
 # ==============================================================================
 # RESULTS AND VISUALIZATION
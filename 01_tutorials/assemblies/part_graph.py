@@ -1,4 +1,10 @@
 import os
+from functools import cached_property
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import breadth_first_order, connected_components
+
 import compas_fea2
 from compas_fea2.model import Model, Part
 from compas_fea2.model import SolidSection, Steel
@@ -8,6 +14,68 @@ from compas.geometry import Translation
 
 units = units(system="SI_mm")
 
+
+class PartGraph:
+    """Connectivity graph of a part in compressed sparse row (CSR) form.
+
+    The node-element incidence is built from the element connectivity, and
+    the node-node and element-element adjacencies are derived from it with
+    sparse products. Each matrix is computed the first time it is needed.
+
+    Parameters
+    ----------
+    part : :class:`compas_fea2.model.Part`
+    """
+
+    def __init__(self, part):
+        self.nodes = list(part.nodes)
+        self.elements = list(part.elements)
+        self.node_index = {node: i for i, node in enumerate(self.nodes)}
+
+    @cached_property
+    def node_element(self):
+        """(n_nodes, n_elements) incidence matrix."""
+        rows = [self.node_index[n] for e in self.elements for n in e.nodes]
+        cols = np.repeat(np.arange(len(self.elements)), [len(e.nodes) for e in self.elements])
+        data = np.ones(len(rows), dtype=np.int32)
+        return csr_matrix((data, (rows, cols)), shape=(len(self.nodes), len(self.elements)))
+
+    @cached_property
+    def node_node(self):
+        """(n_nodes, n_nodes) adjacency: nodes sharing at least one element."""
+        adjacency = (self.node_element @ self.node_element.T).tocsr()
+        adjacency.setdiag(0)
+        adjacency.eliminate_zeros()
+        return adjacency
+
+    @cached_property
+    def element_element(self):
+        """(n_elements, n_elements) adjacency: elements sharing at least one node."""
+        adjacency = (self.node_element.T @ self.node_element).tocsr()
+        adjacency.setdiag(0)
+        adjacency.eliminate_zeros()
+        return adjacency
+
+    def neighbors(self, node):
+        """The nodes connected to a node by at least one element."""
+        i = self.node_index[node]
+        indptr, indices = self.node_node.indptr, self.node_node.indices
+        return [self.nodes[j] for j in indices[indptr[i] : indptr[i + 1]]]
+
+    def degree(self):
+        """Number of neighbours of every node."""
+        return np.diff(self.node_node.indptr)
+
+    def connected_components(self):
+        """Number of connected components and the label of every node."""
+        return connected_components(self.node_node, directed=False)
+
+    def bfs(self, node):
+        """Nodes in breadth-first order from a node, with their predecessors."""
+        order, predecessors = breadth_first_order(self.node_node, self.node_index[node], directed=False)
+        return [self.nodes[i] for i in order], predecessors[order]
+
+
 # ==============================================================================
 # Define the data files
 # ==============================================================================
@@ -36,3 +104,13 @@ for i in range(1, 4):
 
 print(set(mdl.graph.neighbors(prt)))
 print(set(prt.graph.neighbors(list(prt.nodes)[10])))
+
+# CSR connectivity graph of the part
+graph = PartGraph(prt)
+node = list(prt.nodes)[10]
+print(set(graph.neighbors(node)))
+print("Max node degree: ", graph.degree().max())
+print("Connected components: ", graph.connected_components()[0])
+order, _ = graph.bfs(node)
+print("Nodes reached from node 10: ", len(order))
+print("Elements adjacent to element 0: ", graph.element_element[0].indices)
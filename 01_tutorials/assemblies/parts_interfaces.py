@@ -1,4 +1,5 @@
 import os
+import numpy as np
 import compas_fea2
 from compas_fea2.model import Model, Part
 from compas_fea2.model import SolidSection, Steel
@@ -6,12 +7,67 @@ from compas_fea2.units import units
 
 from compas.geometry import Translation
 
-# from compas_fea2.utilities.interfaces_numpy import mesh_mesh_interfaces
+from compas_fea2.utilities.interfaces_numpy import mesh_mesh_interfaces
 
 from compas_fea2_vedo.viewer import ModelViewer
 
 units = units(system="SI_mm")
 
+
+def broad_phase_pairs(parts, tol=0.0):
+    """Pairs of parts with overlapping bounding boxes (sweep and prune).
+
+    The boxes, inflated by ``tol``, are sorted along x. For each box, the
+    candidates are the boxes starting before it ends along x (found with a
+    binary search), and among those only the ones overlapping along y and z
+    are kept. Only the candidate pairs are passed to the narrow phase.
+
+    Parameters
+    ----------
+    parts : list[:class:`compas_fea2.model.Part`]
+    tol : float, optional
+        Tolerance added to the bounding boxes.
+
+    Returns
+    -------
+    list[tuple(int, int)]
+        Indices of the candidate pairs, with i < j.
+    """
+    corners = np.array([part.bounding_box.points for part in parts])  # (P, 8, 3)
+    lo = corners.min(axis=1) - tol
+    hi = corners.max(axis=1) + tol
+
+    order = np.argsort(lo[:, 0])
+    lo, hi = lo[order], hi[order]
+    ends = np.searchsorted(lo[:, 0], hi[:, 0], side="right")
+
+    pairs = []
+    for i in range(len(parts)):
+        j = np.arange(i + 1, ends[i])
+        overlap = np.all((lo[j, 1:] <= hi[i, 1:]) & (hi[j, 1:] >= lo[i, 1:]), axis=1)
+        a, b = order[i], order[j[overlap]]
+        pairs.extend((min(a, k), max(a, k)) for k in b)
+    return pairs
+
+
+def detect_interfaces(mdl, tol=0.0):
+    """Find the interfaces between the parts of a model.
+
+    The broad phase selects the pairs of parts with overlapping bounding
+    boxes; the narrow phase computes the interfaces of the candidate pairs
+    only, and a contact edge is added to the model graph for each of them.
+    """
+    parts = list(mdl.parts)
+    interfaces_dict = {}
+    for i, j in broad_phase_pairs(parts, tol):
+        part, neighbor = parts[i], parts[j]
+        interfaces = mesh_mesh_interfaces(part.bounding_box.to_mesh(), neighbor.bounding_box.to_mesh())
+        if interfaces:
+            mdl.graph.add_edge(part, neighbor, relation="contact")
+            interfaces_dict[(part, neighbor)] = interfaces
+    return interfaces_dict
+
+
 # ==============================================================================
 # Define the data files
 # ==============================================================================
@@ -48,21 +104,7 @@ part2 = list(mdl.parts)[1]
 part3 = list(mdl.parts)[2]
 
 
-interfaces_dict = {}
-for i, part in enumerate(mdl.parts):
-    for j, neighbor in enumerate(mdl.parts):
-        if i >= j:  # Avoid duplicate checks (A vs B is same as B vs A)
-            continue
-
-        mesh1 = part.bounding_box.to_mesh()
-        mesh2 = neighbor.bounding_box.to_mesh()
-        interfaces = mesh_mesh_interfaces(mesh1, mesh2)
-
-        if interfaces:
-            mdl.graph.add_edge(
-                part, neighbor, relation="contact"
-            )  # Add edge dynamically
-            interfaces_dict[(part, neighbor)] = interfaces
+interfaces_dict = detect_interfaces(mdl, tol=1)
 
 print(interfaces_dict)
 viewer = ModelViewer(mdl)
@@ -11,11 +11,16 @@ Steps:
 3. Set boundary conditions at the base of the frame.
 4. Define a static problem and add loads.
 5. Run the analysis and visualize the results.
+6. Check the utilization of all the beam elements over all the steps.
 """
 
 # Import necessary classes from compas_fea2 for creating the model, materials, and elements
 import os
+import sqlite3
+from contextlib import closing
+
 import gmsh
+import numpy as np
 from compas.geometry import Plane
 
 import compas_fea2
@@ -75,6 +80,9 @@ mat = ElasticIsotropic(
     v=0.2,  # Poisson's ratio (dimensionless)
     density=2400 * units("kg/m**3"),  # Density (2400 kg/m³)
 )
+# Design strength of each material, used for the utilization check (Step 10).
+# ElasticIsotropic does not define a strength, so it is a design input.
+design_strength = {mat: (20 * units.MPa).to_base_units().magnitude}
 
 # === Step 5: Define Cross-Sections ===
 # Define rectangular cross-sections for columns and beams
@@ -196,19 +204,35 @@ stp.add_uniform_node_load(
 )
 
 # Define field outputs
-fout = [DisplacementFieldResults, ReactionFieldResults]
+fout = [DisplacementFieldResults, ReactionFieldResults, SectionForcesFieldResults]
 stp.add_outputs(fout)
 
-# Set up the problem
+# Add a second load case with a horizontal load on the same nodes. The loads of
+# a step are carried over to the following steps of the same problem, so the
+# wind case is analysed as a separate problem.
+stp_wind = StaticStep(name="wind")
+stp_wind.combination = LoadCombination.ULS()
+stp_wind.add_uniform_node_load(
+    nodes=prt.find_nodes_on_plane(Plane([0, 0, nz * lz], [0, 0, 1])),
+    x=1 * units.kN,
+    z=-1 * units.kN,
+    load_case="LL",
+)
+stp_wind.add_outputs(fout)
+
+# Set up the problems
 prb = Problem("3d_frame_Fx")
 prb.add_step(stp)
+prb_wind = Problem("3d_frame_wind")
+prb_wind.add_step(stp_wind)
 
-# Add the problem to the model
+# Add the problems to the model
 mdl.add_problem(problem=prb)
+mdl.add_problem(problem=prb_wind)
 
 # === Step 9: Run the Analysis and Show Results ===
 # Analyze and extract results to SQLite database
-mdl.analyse_and_extract(problems=[prb], path=TEMP, verbose=True)
+mdl.analyse_and_extract(problems=[prb, prb_wind], path=TEMP, verbose=True)
 
 # Get displacement and reaction fields
 disp = stp.displacement_field
@@ -223,3 +247,71 @@ react = stp.reaction_field
 # stp.show_displacements(stp, fast=True, show_bcs=0.5, show_loads=1, show_vectors=False)
 stp.show_deformed(scale_results=1000, show_bcs=0.5, show_loads=10)
 stp.show_reactions(stp, show_vectors=0.05, show_bcs=0.05, show_contours=0.5)
+
+# === Step 10: Utilization of the Beam Elements ===
+# Section properties and strengths of all the beam elements, computed once.
+# The section moduli and the shear stress factor (1.5 V / A) are those of
+# rectangular sections.
+beams = [e for e in prt.elements if isinstance(e, BeamElement)]
+for e in beams:
+    if not isinstance(e.section, RectangularSection):
+        raise TypeError(f"Utilization check not implemented for {type(e.section).__name__} (element {e.key})")
+    if e.section.material not in design_strength:
+        raise ValueError(f"No design strength for the material of element {e.key}")
+f_d = np.array([design_strength[e.section.material] for e in beams])
+A = np.array([e.section.A for e in beams])
+W1 = np.array([e.section.Ixx / (e.section.h / 2) for e in beams])
+W2 = np.array([e.section.Iyy / (e.section.w / 2) for e in beams])
+
+
+def end_forces(step, part, elements):
+    """Section forces at the two ends of the beams of a part in a step.
+
+    The rows of the step are read from the results database in one query and
+    matched to the elements by key.
+
+    Returns
+    -------
+    numpy.ndarray
+        (n, 2, 6) array of N, V1, V2, T, M1, M2 in the local axes of the
+        elements, end 1 first.
+    """
+    field = step.section_forces_field
+    columns = ", ".join(["key"] + list(field.components_names))
+    query = f"SELECT {columns} FROM {field.field_name} WHERE step = ? AND part = ?"
+    with closing(sqlite3.connect(step.problem.path_db)) as connection:
+        rows = connection.execute(query, (step.name, part.name)).fetchall()
+    data = np.asarray(rows, dtype=np.float64).reshape(-1, 13)
+
+    keys = np.array([e.key for e in elements])
+    order = np.argsort(data[:, 0])
+    sorted_keys = data[order, 0].astype(np.int64)
+    pos = np.minimum(np.searchsorted(sorted_keys, keys), max(len(sorted_keys) - 1, 0))
+    if len(sorted_keys) == 0 or np.any(sorted_keys[pos] != keys):
+        raise ValueError(f"Missing section forces in step {step.name}")
+    return data[order[pos], 1:].reshape(-1, 2, 6)
+
+
+# Stream over the steps, keeping only the governing utilization of each element
+governing = np.zeros(len(beams))
+governing_station = np.zeros(len(beams), dtype=int)
+governing_step = np.full(len(beams), -1)
+steps = [stp, stp_wind]
+for k, step in enumerate(steps):
+    forces = end_forces(step, prt, beams)  # (n, 2, 6)
+    N, V1, V2, T, M1, M2 = np.moveaxis(np.abs(forces), -1, 0)  # each (n, 2)
+
+    sigma = N / A[:, None] + M1 / W1[:, None] + M2 / W2[:, None]
+    tau = 1.5 * np.hypot(V1, V2) / A[:, None]
+    utilization = np.sqrt(sigma**2 + 3 * tau**2) / f_d[:, None]
+
+    station = utilization.argmax(axis=1)
+    value = utilization[np.arange(len(beams)), station]
+    update = value > governing
+    governing[update] = value[update]
+    governing_station[update] = station[update]
+    governing_step[update] = k
+
+i = int(governing.argmax())
+print(f"Max utilization: {governing[i]:.3f} in element {beams[i].key}, end {governing_station[i] + 1}, step {steps[governing_step[i]].name}")
+print(f"Elements with utilization > 1: {np.count_nonzero(governing > 1)} of {len(beams)}")
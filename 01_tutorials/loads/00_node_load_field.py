@@ -0,0 +1,149 @@
+"""
+Tutorial: Non-uniform nodal loads from arrays
+
+Hydrostatic or wind pressure maps give a different load at every node.
+Instead of one call (and one load object) per node, the loads are described
+as a (n, 6) array - or as a vectorized function of the node coordinates - and
+added in bulk: nodes sharing the same load vector are grouped together, so the
+step receives one uniform node load per distinct value, and the input writers
+emit each group as a single block.
+
+Steps:
+1. Create a vertical wall made of shell elements.
+2. Define the hydrostatic load as a function of the node coordinates.
+3. Add the load field to the step and run the analysis.
+"""
+
+import os
+from math import pi
+
+import numpy as np
+from compas.datastructures import Mesh
+from compas.geometry import Plane
+
+import compas_fea2
+from compas_fea2.model import Model, Part
+from compas_fea2.model import ElasticIsotropic, ShellSection
+from compas_fea2.problem import LoadCombination
+from compas_fea2.results import DisplacementFieldResults, ReactionFieldResults
+from compas_fea2.units import units
+
+units = units(system="SI_mm")
+
+# Set the backend implementation
+# compas_fea2.set_backend("compas_fea2_opensees")
+compas_fea2.set_backend("compas_fea2_calculix")
+# compas_fea2.set_backend("compas_fea2_abaqus")
+# compas_fea2.set_backend("compas_fea2_castem")
+# compas_fea2.set_backend('compas_fea2_sofistik')
+
+HERE = os.path.dirname(__file__)
+TEMP = os.path.join(HERE, "..", "..", "temp")
+
+LOAD_COMPONENTS = ("x", "y", "z", "xx", "yy", "zz")
+
+
+# ==============================================================================
+# Load field helper
+# ==============================================================================
+def add_node_load_field(step, nodes, loads, load_case=None, decimals=6):
+    """Add a non-uniform load to a group of nodes in bulk.
+
+    Parameters
+    ----------
+    step : :class:`compas_fea2.problem.StaticStep`
+        The step receiving the loads.
+    nodes : list[:class:`compas_fea2.model.Node`]
+        The loaded nodes.
+    loads : numpy.ndarray | callable
+        Either a (n, 6) array of nodal loads (x, y, z, xx, yy, zz), or a
+        vectorized function taking the (n, 3) node coordinates and returning
+        such an array.
+    load_case : str, optional
+        The load case of the loads.
+    decimals : int, optional
+        Loads are rounded to this number of decimals before grouping.
+
+    Returns
+    -------
+    int
+        The number of uniform node loads added to the step.
+    """
+    nodes = list(nodes)
+    if callable(loads):
+        loads = loads(np.array([node.xyz for node in nodes]))
+    loads = np.round(np.asarray(loads, dtype=np.float64), decimals)
+    if loads.shape != (len(nodes), 6):
+        raise ValueError(f"Expected a ({len(nodes)}, 6) load array, got {loads.shape}.")
+
+    values, groups = np.unique(loads, axis=0, return_inverse=True)
+    groups = groups.ravel()
+    order = np.argsort(groups, kind="stable")
+    splits = np.cumsum(np.bincount(groups))[:-1]
+    for value, members in zip(values, np.split(order, splits)):
+        if not value.any():
+            continue
+        components = {c: v for c, v in zip(LOAD_COMPONENTS, value) if v}
+        step.add_uniform_node_load(nodes=[nodes[i] for i in members], load_case=load_case, **components)
+    return int(np.count_nonzero(values.any(axis=1)))
+
+
+# ==============================================================================
+# Geometry & mesh: a vertical wall in the XZ plane
+# ==============================================================================
+lx = (4 * units.m).to_base_units().magnitude
+lz = (3 * units.m).to_base_units().magnitude
+nx, nz = 40, 30
+dx, dz = lx / nx, lz / nz
+
+wall = Mesh.from_meshgrid(lx, nx, lz, nz)
+wall = wall.rotated(pi / 2, [1, 0, 0])
+
+mdl = Model(name="hydrostatic_wall")
+mat = ElasticIsotropic(E=30 * units.GPa, v=0.2, density=2500 * units("kg/m**3"))
+sec = ShellSection(t=200 * units.mm, material=mat)
+prt = Part.shell_from_compas_mesh(mesh=wall, section=sec)
+mdl.add_part(prt)
+
+mdl.add_fix_bc(nodes=prt.find_nodes_on_plane(Plane.worldXY()))
+
+# ==============================================================================
+# Hydrostatic load: p(z) = gamma * (H - z) times the tributary area of the node
+# ==============================================================================
+gamma = (10 * units("kN/m**3")).to_base_units().magnitude
+H = lz
+
+
+def hydrostatic(xyz):
+    x, z = xyz[:, 0], xyz[:, 2]
+    # tributary area on the regular grid: halved on the edges, quartered in the corners
+    wx = np.where(np.isclose(x, 0) | np.isclose(x, lx), 0.5, 1.0)
+    wz = np.where(np.isclose(z, 0) | np.isclose(z, lz), 0.5, 1.0)
+    loads = np.zeros((len(xyz), 6))
+    loads[:, 1] = gamma * np.clip(H - z, 0, None) * dx * dz * wx * wz
+    return loads
+
+
+# ==============================================================================
+# Problem
+# ==============================================================================
+prb = mdl.add_problem(name="hydrostatic")
+stp = prb.add_static_step()
+stp.combination = LoadCombination.SLS()
+
+n_loads = add_node_load_field(stp, prt.nodes, hydrostatic, load_case="LL")
+print(f"{len(prt.nodes)} loaded nodes grouped in {n_loads} node loads")
+
+stp.add_outputs([DisplacementFieldResults, ReactionFieldResults])
+
+mdl.analyse_and_extract(problems=[prb], path=TEMP, verbose=True)
+
+# ==============================================================================
+# Results
+# ==============================================================================
+# The total hydrostatic thrust is gamma * H^2 / 2 * width
+reaction_vector, applied_load = stp.check_force_equilibrium()
+print("Applied load in Y [N]: ", applied_load[1])
+print("Theoretical thrust [N]: ", gamma * H**2 / 2 * lx)
+
+stp.show_deformed(scale_results=1000, show_original=0.2, show_bcs=0.3, show_loads=0.01)
@@ -10,6 +10,11 @@ import time
 import cProfile
 import pstats
 
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+
 from compas_fea2_vedo.viewer import ModelViewer
 
 
@@ -32,11 +37,11 @@ def profile_function(func, *args, **kwargs):
 # ==============================================================================
 # Visualize in COMPAS Viewer
 # ==============================================================================
-def view_meshes(geo):
+def view_meshes(geo, target):
     viewer = Viewer()
     viewer.renderer.camera.scale = 100
     viewer.renderer.camera.position = [0, 0, 2000]
-    viewer.renderer.camera.target = prt.bounding_box.to_mesh().centroid()
+    viewer.renderer.camera.target = target
     viewer.renderer.camera.near = 10
     viewer.renderer.camera.far = 10000
     # viewer.scene.add(prt.discretized_boundary_mesh, show_faces=True, show_edges=True)
@@ -97,6 +102,99 @@ def merge_all_faces_delaunay(mesh):
     return delaunay_mesh
 
 
+# ==============================================================================
+# Vectorized planar regions
+# ==============================================================================
+def face_planes(xyz, faces):
+    """Unit normals and offsets (n . x = d) of triangular faces.
+
+    Parameters
+    ----------
+    xyz : numpy.ndarray
+        (n, 3) coordinates of the vertices.
+    faces : numpy.ndarray
+        (m, 3) vertex indices of the faces.
+
+    Returns
+    -------
+    tuple(numpy.ndarray, numpy.ndarray)
+        (m, 3) normals and (m,) offsets.
+    """
+    a, b, c = (xyz[faces[:, i]] for i in range(3))
+    normals = np.cross(b - a, c - a)
+    normals /= np.linalg.norm(normals, axis=1)[:, None]
+    offsets = np.einsum("ij,ij->i", normals, (a + b + c) / 3)
+    return normals, offsets
+
+
+def cluster_planes(normals, offsets, tol=1.0, angle_tol=2.0):
+    """Label the faces lying on the same plane.
+
+    The normals and the offsets are quantized with steps of ``angle_tol``
+    (in degrees, as a distance between unit vectors) and ``tol``, so the faces
+    are first grouped by hashing (``np.unique``). The cells of the same plane
+    split by the quantization are then merged if their mean (normal, offset)
+    are within one step in every component, with a KD-tree on the (few) cells.
+
+    Returns
+    -------
+    tuple(numpy.ndarray, numpy.ndarray, numpy.ndarray)
+        (m,) plane label of each face, and the normals and offsets of the planes.
+    """
+    step = 2 * np.sin(np.radians(angle_tol) / 2)
+    features = np.column_stack([normals / step, offsets / tol])
+    _, cells = np.unique(np.floor(features).astype(np.int64), axis=0, return_inverse=True)
+    cells = cells.ravel()
+    counts = np.bincount(cells)
+    centres = np.column_stack([np.bincount(cells, weights=f) for f in features.T]) / counts[:, None]
+
+    pairs = cKDTree(centres).query_pairs(1.0, p=np.inf, output_type="ndarray")
+    k = len(centres)
+    graph = coo_matrix((np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])), shape=(k, k))
+    _, cell_labels = connected_components(graph, directed=False)
+    labels = cell_labels[cells]
+
+    n_planes = labels.max() + 1
+    plane_normals = np.column_stack([np.bincount(labels, weights=c, minlength=n_planes) for c in normals.T])
+    plane_normals /= np.linalg.norm(plane_normals, axis=1)[:, None]
+    plane_offsets = np.bincount(labels, weights=offsets) / np.bincount(labels)
+    return labels, plane_normals, plane_offsets
+
+
+def region_labels(faces, labels, n_vertices):
+    """Split the planes in connected regions (faces sharing a vertex).
+
+    All the planes are split at once: each face is connected to the vertices
+    it uses within its plane, and the components of this graph are the regions.
+
+    Returns
+    -------
+    numpy.ndarray
+        (m,) region label of each face.
+    """
+    m = len(faces)
+    rows = np.repeat(np.arange(m), faces.shape[1])
+    # a vertex shared by several planes is a different graph node for each plane
+    _, vertex_nodes = np.unique(labels[rows] * n_vertices + faces.ravel(), return_inverse=True)
+    vertex_nodes = vertex_nodes.ravel() + m
+    n = vertex_nodes.max() + 1
+    graph = coo_matrix((np.ones(len(rows)), (rows, vertex_nodes)), shape=(n, n))
+    _, components = connected_components(graph, directed=False)
+    _, regions = np.unique(components[:m], return_inverse=True)
+    return regions.ravel()
+
+
+def extract_submeshes(xyz, faces, labels):
+    """A mesh for each label, built from the faces with that label."""
+    order = np.argsort(labels, kind="stable")
+    bounds = np.flatnonzero(np.diff(labels[order])) + 1
+    submeshes = []
+    for group in np.split(order, bounds):
+        vertices, local = np.unique(faces[group], return_inverse=True)
+        submeshes.append(Mesh.from_vertices_and_faces(xyz[vertices].tolist(), local.reshape(-1, faces.shape[1]).tolist()))
+    return submeshes
+
+
 units = units(system="SI_mm")
 
 # ==============================================================================
@@ -131,18 +229,34 @@ mdl.add_part(prt)
 print(f"Meshing took {time.perf_counter() - start_time:.4f} seconds")
 
 
-planes = profile_function(
-    prt.extract_clustered_planes, tol=1, angle_tol=2, verbose=False
-)
-submeshes = profile_function(
-    prt.extract_submeshes,
-    planes,
-    tol=10,
-    normal_tol=0.001,
-    split=True,
-)
+# Set to True to profile the library implementation as well
+COMPARE = False
+if COMPARE:
+    planes = profile_function(
+        prt.extract_clustered_planes, tol=1, angle_tol=2, verbose=False
+    )
+    submeshes = profile_function(
+        prt.extract_submeshes,
+        planes,
+        tol=10,
+        normal_tol=0.001,
+        split=True,
+    )
+
+start_time = time.perf_counter()
+vertices, faces = prt.discretized_boundary_mesh.to_vertices_and_faces()
+xyz = np.asarray(vertices, dtype=np.float64)
+faces = np.asarray(faces, dtype=np.int64)
+normals, offsets = face_planes(xyz, faces)
+labels, plane_normals, plane_offsets = cluster_planes(normals, offsets, tol=1, angle_tol=2)
+regions = region_labels(faces, labels, len(xyz))
+submeshes = extract_submeshes(xyz, faces, regions)
+print(f"{len(plane_offsets)} planes, {len(submeshes)} planar regions from {len(faces)} faces in {time.perf_counter() - start_time:.4f} seconds")
 
 submeshes = [merge_all_faces(submesh) for submesh in submeshes]
 
 
-view_meshes(submeshes)
+# Camera target from the boundary arrays already computed (the centre of the
+# bounding box), instead of rebuilding the bounding box of the part
+target = (0.5 * (xyz.min(axis=0) + xyz.max(axis=0))).tolist()
+view_meshes(submeshes, target)
@@ -0,0 +1,221 @@
+"""
+Tutorial: Adjoint sensitivities of a shell
+
+Gradient-based design needs the derivative of the objective with respect to
+the Young's modulus and the thickness of every element. With finite
+differences this would take one analysis per element; with the adjoint method
+it takes two extra load cases whatever the number of elements: the adjoint
+case and the combined (real + adjoint) case needed by the polarization below.
+
+For a linear problem K u = f and an objective J:
+- compliance C = f^T u is self-adjoint:  dC/dp = -u^T dK/dp u
+- a nodal displacement J = u_k has the adjoint load e_k (a unit load at k):
+  dJ/dp = -lambda^T dK/dp u, with K lambda = e_k.
+
+The element stiffness of a shell is K_e = K_m + K_b, with the membrane part
+proportional to E t and the bending part proportional to E t^3, so:
+- dK_e/dE = K_e / E
+- dK_e/dt = (K_m + 3 K_b) / t
+The transverse-shear stiffness (proportional to E t) is left out of this split:
+its energy is not separated from the membrane and bending energies, so dC/dt
+is approximate for thick shells.
+
+The element products u^T K u and lambda^T K u are obtained from the strain
+energies of the elements: the membrane and bending energies come from the
+mid-plane and the top/bottom strain energy densities, and the mutual energy
+from the polarization identity lambda^T K u = U(u + lambda) - U(u) - U(lambda).
+The real, adjoint and combined cases are three separate problems, submitted
+together: as steps of one problem, the adjoint and combined cases could
+inherit the real load (with CalculiX and Abaqus the loads of a step are kept in
+the following steps), which would make the polarization silently wrong.
+
+Steps:
+1. Build the shell model.
+2. Define the real, adjoint and combined load cases.
+3. Run the analyses.
+4. Compute the element-aligned gradient arrays.
+5. Verify one entry with a finite difference.
+"""
+
+import os
+
+import numpy as np
+from compas.datastructures import Mesh
+from compas.geometry import Scale, Plane
+from compas_gmsh.models import MeshModel
+
+import compas_fea2
+from compas_fea2.model import Model, Part
+from compas_fea2.model import ShellSection, ElasticIsotropic
+from compas_fea2.problem import LoadCombination
+from compas_fea2.results import DisplacementFieldResults, StressFieldResults
+from compas_fea2.units import units
+
+units = units(system="SI_mm")
+
+# Set the backend implementation
+compas_fea2.set_backend("compas_fea2_opensees")
+# compas_fea2.set_backend("compas_fea2_calculix")
+# compas_fea2.set_backend("compas_fea2_abaqus")
+# compas_fea2.set_backend("compas_fea2_castem")
+# compas_fea2.set_backend('compas_fea2_sofistik')
+
+HERE = os.path.dirname(__file__)
+DATA = os.path.join(HERE, "..", "..", "00_data")
+TEMP = os.path.join(HERE, "..", "..", "temp")
+
+
+# ==============================================================================
+# Sensitivity helpers
+# ==============================================================================
+def element_energies(elements, step, volumes):
+    """Membrane and bending strain energies of shell elements in a step.
+
+    With stresses varying linearly through the thickness, the energy of an
+    element is V (w_mid + w_b / 3), where w_b = (w_top + w_bottom) / 2 - w_mid
+    is the energy density of the bending stresses.
+
+    Returns
+    -------
+    tuple(numpy.ndarray, numpy.ndarray)
+        The membrane and the bending energies of the elements.
+    """
+    w = np.zeros((len(elements), 3))
+    for i, element in enumerate(elements):
+        results = element.stress_results(step)
+        w[i] = [
+            results.mid_plane_stress_result.strain_energy_density,
+            results.top_plane_stress_result.strain_energy_density,
+            results.bottom_plane_stress_result.strain_energy_density,
+        ]
+    w_mid, w_top, w_bottom = w.T
+    w_bending = np.maximum(0.5 * (w_top + w_bottom) - w_mid, 0.0)
+    return w_mid * volumes, w_bending * volumes / 3
+
+
+def gradients(products, E, t):
+    """Gradients of an objective J with dJ/dp = -x^T dK/dp u.
+
+    Parameters
+    ----------
+    products : tuple(numpy.ndarray, numpy.ndarray)
+        The membrane and bending parts of x^T K_e u for every element.
+    E, t : numpy.ndarray
+        Young's modulus and thickness of every element.
+
+    Returns
+    -------
+    tuple(numpy.ndarray, numpy.ndarray)
+        dJ/dE and dJ/dt, aligned with the elements.
+    """
+    membrane, bending = products
+    return -(membrane + bending) / E, -(membrane + 3 * bending) / t
+
+
+# ==============================================================================
+# Step 1: Model
+# ==============================================================================
+mdl = Model(name="shell_sensitivities")
+
+mesh = Mesh.from_obj(os.path.join(DATA, "shell", "tofea_f.obj"))
+mesh.transform(Scale.from_factors([1000.0] * 3))
+model = MeshModel.from_mesh(mesh, targetlength=1000)
+model.heal()
+model.generate_mesh(2)
+compas_mesh = model.mesh_to_compas()
+
+E0 = (10 * units.GPa).to_base_units().magnitude
+t0 = (20 * units.mm).to_base_units().magnitude
+mat = ElasticIsotropic(E=E0, v=0.2, density=1500 * units("kg/m**3"))
+sec = ShellSection(t=t0, material=mat)
+
+prt = Part.shell_from_compas_mesh(mesh=compas_mesh, section=sec)
+mdl.add_part(prt)
+mdl.add_pin_bc(nodes=prt.find_nodes_on_plane(Plane([0, 0, 0], [0, 0, 1])))
+
+elements = list(prt.elements)
+node_index = {node: i for i, node in enumerate(prt.nodes)}
+xyz = np.array([node.xyz for node in prt.nodes])
+triangles = xyz[np.array([[node_index[n] for n in e.nodes[:3]] for e in elements])]
+areas = 0.5 * np.linalg.norm(np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0]), axis=1)
+E = np.full(len(elements), E0)
+t = np.full(len(elements), t0)
+volumes = areas * t
+
+# ==============================================================================
+# Step 2: Real, adjoint and combined load cases
+# ==============================================================================
+# Objective node: the highest point of the shell, vertical displacement
+top_node = max(prt.nodes, key=lambda n: n.z)
+unit_load = (1 * units.N).to_base_units().magnitude
+
+def add_case(name, real=True, adjoint=False):
+    """A problem with a single step carrying the loads of a case."""
+    prb = mdl.add_problem(name=f"sensitivities_{name}")
+    stp = prb.add_static_step(name=name, min_inc_size=0.1)
+    stp.combination = LoadCombination.SLS()
+    if real:
+        stp.add_uniform_node_load(nodes=prt.nodes, load_case="LL", z=-1 * units.kN)
+    if adjoint:
+        stp.add_uniform_node_load(nodes=[top_node], load_case="LL", z=unit_load)
+    stp.add_outputs([DisplacementFieldResults, StressFieldResults])
+    return stp
+
+
+stp_real = add_case("real")
+stp_adjoint = add_case("adjoint", real=False, adjoint=True)
+stp_combined = add_case("combined", adjoint=True)
+
+# ==============================================================================
+# Step 3: Analyses (one problem per load case)
+# ==============================================================================
+problems = [stp_real.problem, stp_adjoint.problem, stp_combined.problem]
+mdl.analyse_and_extract(problems=problems, path=TEMP, verbose=True, erase_data=True)
+
+# ==============================================================================
+# Step 4: Gradients
+# ==============================================================================
+U_real = element_energies(elements, stp_real, volumes)
+U_adjoint = element_energies(elements, stp_adjoint, volumes)
+U_combined = element_energies(elements, stp_combined, volumes)
+
+# Compliance: u^T K_e u = 2 U_e
+dC_dE, dC_dt = gradients(tuple(2 * u for u in U_real), E, t)
+
+# Strain energy of the structure: half the compliance
+dU_dE, dU_dt = 0.5 * dC_dE, 0.5 * dC_dt
+
+# Vertical displacement of the top node: lambda^T K_e u by polarization
+mutual = tuple(c - r - a for c, r, a in zip(U_combined, U_real, U_adjoint))
+dw_dE, dw_dt = gradients(mutual, E, t)
+dw_dE, dw_dt = dw_dE / unit_load, dw_dt / unit_load
+
+compliance = 2 * sum(u.sum() for u in U_real)
+w_top = stp_real.displacement_field.get_result_at(top_node).z
+print(f"Compliance: {compliance:.4e}")
+print(f"Vertical displacement of node {top_node.key}: {w_top:.4f} mm")
+for name, g in (("dC/dE", dC_dE), ("dC/dt", dC_dt), ("dw/dE", dw_dE), ("dw/dt", dw_dt)):
+    i = int(np.argmax(np.abs(g)))
+    print(f"{name}: max |g| = {abs(g[i]):.4e} at element {elements[i].key}")
+
+np.savez(
+    os.path.join(TEMP, "shell_sensitivities.npz"),
+    dC_dE=dC_dE,
+    dC_dt=dC_dt,
+    dU_dE=dU_dE,
+    dU_dt=dU_dt,
+    dw_dE=dw_dE,
+    dw_dt=dw_dt,
+)
+
+# ==============================================================================
+# Step 5: Finite-difference check on the most sensitive element
+# ==============================================================================
+i = int(np.argmax(np.abs(dC_dt)))
+dt = 0.01 * t0
+elements[i].section = ShellSection(t=t0 + dt, material=mat)
+volumes_fd = volumes.copy()
+volumes_fd[i] = areas[i] * (t0 + dt)
+mdl.analyse_and_extract(problems=[stp_real.problem], path=TEMP, erase_data=True)
+compliance_fd = 2 * sum(u.sum() for u in element_energies(elements, stp_real, volumes_fd))
+print(f"dC/dt of element {elements[i].key}: adjoint {dC_dt[i]:.4e}, finite difference {(compliance_fd - compliance) / dt:.4e}")
@@ -0,0 +1,146 @@
+"""
+Tutorial: Parametric sweep over a shared mesh
+
+Same mesh, many variants: this tutorial sweeps the thickness, the Young's
+modulus and the load magnitude of a cantilever plate over a grid of values.
+
+- The mesh is generated once and shared by all the variants (gmsh is not run
+  again).
+- Each variant rebuilds the model and the part from the shared mesh with its
+  own section/material, and writes and analyses a full input file in its own
+  folder; the variants are dispatched in parallel to a pool of processes.
+  Writing only the changes of each variant with respect to a base input file
+  is not supported by the input writers, so it is not done here.
+- The problem is linear, so the load magnitude does not need new analyses:
+  the results of a unit load are scaled.
+- All the results are collected in one array indexed by the parameter values
+  and saved to disk together with the parameter axes.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+from math import pi
+
+import numpy as np
+from compas.datastructures import Mesh
+from compas.geometry import Plane
+from compas_gmsh.models import MeshModel
+
+import compas_fea2
+from compas_fea2.model import Model, Part
+from compas_fea2.model import ElasticIsotropic, ShellSection
+from compas_fea2.problem import LoadCombination
+from compas_fea2.results import DisplacementFieldResults
+from compas_fea2.units import units
+
+# ==============================================================================
+# UNITS: SI-mm
+# ==============================================================================
+units = units(system="SI_mm")
+
+# Set the backend implementation
+# compas_fea2.set_backend("compas_fea2_opensees")
+compas_fea2.set_backend("compas_fea2_calculix")
+# compas_fea2.set_backend("compas_fea2_abaqus")
+# compas_fea2.set_backend("compas_fea2_castem")
+# compas_fea2.set_backend('compas_fea2_sofistik')
+
+HERE = os.path.dirname(__file__)
+TEMP = os.sep.join(HERE.split(os.sep)[:-2] + ["temp"])
+SWEEP = os.path.join(TEMP, "sweep")
+
+# ==============================================================================
+# PARAMETER GRID
+# ==============================================================================
+lx = (1 * units.m).to_base_units().magnitude  # 1000 mm
+ly = (30 * units.cm).to_base_units().magnitude  # 300 mm
+
+THICKNESSES = np.linspace(2, 10, 5)  # [mm]
+YOUNG_MODULI = np.array([70000.0, 110000.0, 210000.0])  # [MPa]
+LOADS = np.linspace(0.5, 5, 10)  # [kN]
+MAX_WORKERS = 4
+
+
+# ==============================================================================
+# VARIANTS
+# ==============================================================================
+def build_variant(mesh, t, E):
+    """Build the model and the problem of a variant with a unit tip load.
+
+    The whole model (nodes and elements included) is rebuilt from the mesh:
+    only the section and the material differ between the variants.
+    """
+    mdl = Model(name="sweep_plate")
+    mat = ElasticIsotropic(E=E * units("MPa"), v=0.2, density=7800 * units("kg/m**3"))
+    sec = ShellSection(material=mat, t=t * units.mm)
+    prt = Part.shell_from_compas_mesh(mesh=mesh, section=sec)
+    mdl.add_part(prt)
+    mdl.add_fix_bc(nodes=prt.find_nodes_on_plane(Plane([0, 0, 0], [1, 0, 0])))
+
+    prb = mdl.add_problem(name="sweep")
+    stp = prb.add_static_step()
+    stp.combination = LoadCombination.SLS()
+    loaded_nodes = prt.find_nodes_on_plane(Plane([lx, 0, 0], [1, 0, 0]))
+    stp.add_uniform_node_load(nodes=loaded_nodes, z=-(1.0 / len(loaded_nodes)) * units.kN, load_case="LL")
+    stp.add_output(DisplacementFieldResults)
+    return mdl, prb, stp
+
+
+def run_variant(index, mesh, t, E):
+    """Analyse a variant in its own folder and return the tip deflection."""
+    mdl, prb, stp = build_variant(mesh, t, E)
+    path = os.path.join(SWEEP, "-".join(str(i) for i in index))
+    mdl.analyse_and_extract(problems=[prb], path=path, erase_data=True)
+    return index, stp.displacement_field.get_min_result("z").z
+
+
+def lookup(results, **parameters):
+    """Read the sweep results at the given parameter values."""
+    axes = {name: results[name] for name in ("t", "E", "load")}
+    index = tuple(
+        int(np.argmin(np.abs(axes[name] - parameters[name]))) if name in parameters else slice(None) for name in axes
+    )
+    return results["deflection"][index]
+
+
+if __name__ == "__main__":
+    # ==========================================================================
+    # SHARED MESH
+    # ==========================================================================
+    plate = Mesh.from_polygons([[[0, 0, 0], [lx, 0, 0], [lx, ly, 0], [0, ly, 0]]])
+    plate = plate.rotated(pi / 2, [1, 0, 0])
+    model = MeshModel.from_mesh(plate, targetlength=30)
+    model.heal()
+    model.generate_mesh(2)
+    mesh = model.mesh_to_compas()
+
+    # ==========================================================================
+    # DISPATCH (only thickness and E need an analysis)
+    # ==========================================================================
+    unit_deflection = np.full((len(THICKNESSES), len(YOUNG_MODULI)), np.nan)
+    with ProcessPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = [
+            executor.submit(run_variant, (i, j), mesh, t, E)
+            for (i, t), (j, E) in product(enumerate(THICKNESSES), enumerate(YOUNG_MODULI))
+        ]
+        for future in as_completed(futures):
+            (i, j), w = future.result()
+            unit_deflection[i, j] = w
+            print(f"t = {THICKNESSES[i]:5.1f} mm, E = {YOUNG_MODULI[j]:8.0f} MPa -> w = {w:.4f} mm/kN")
+
+    # ==========================================================================
+    # RESULTS STORE: (t, E, load)
+    # ==========================================================================
+    deflection = unit_deflection[:, :, None] * LOADS[None, None, :]
+    np.savez(
+        os.path.join(SWEEP, "sweep_results.npz"),
+        t=THICKNESSES,
+        E=YOUNG_MODULI,
+        load=LOADS,
+        deflection=deflection,
+    )
+
+    results = np.load(os.path.join(SWEEP, "sweep_results.npz"))
+    print("Deflection for t=6 mm, E=210 GPa, all loads [mm]: ", lookup(results, t=6, E=210000))
+    print("Deflection for a 5 kN load, all variants [mm]:\n", lookup(results, load=5))
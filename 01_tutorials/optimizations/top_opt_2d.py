@@ -1,4 +1,7 @@
 import os
+import csv
+import hashlib
+import weakref
 from math import pi
 from compas.datastructures import Mesh
 from compas_gmsh.models import MeshModel
@@ -9,6 +12,8 @@ from compas_fea2.model import ElasticIsotropic, ShellSection
 from compas_fea2.problem import StaticStep, LoadCombination
 from compas_fea2.results import StressFieldResults
 import numpy as np
+from scipy.sparse import coo_matrix, identity
+from scipy.spatial import cKDTree
 from compas_fea2.units import units
 import matplotlib.pyplot as plt
 
@@ -48,8 +53,9 @@ model.generate_mesh(2)
 mdl = Model(name="beam_shell_tri")
 
 base_E = 210000.0  # Elastic modulus [MPa] (210 GPa in N/mm²)
+thickness = 5.0  # Shell thickness [mm]
 mat = ElasticIsotropic(E=base_E * units("MPa"), v=0.2, density=7800 * units("kg/m**3"))
-sec = ShellSection(material=mat, t=5 * units.mm)
+sec = ShellSection(material=mat, t=thickness * units.mm)
 
 prt = Part.from_gmsh(gmshModel=model, section=sec, name="beam")
 mdl.add_part(prt)
@@ -60,134 +66,237 @@ for node in prt.nodes:
     if abs(node.x) < tol_x:
         mdl.add_fix_bc(nodes=[node])
 
-# Overwrite each element's section (each gets its own material instance)
-for element in prt.elements:
-    mat_el = ElasticIsotropic(
-        E=base_E * units("MPa"), v=0.2, density=7800 * units("kg/m**3")
-    )
-    sec_el = ShellSection(material=mat_el, t=5 * units.mm)
-    element.section = sec_el
+# Graded stiffness: instead of one material per element, the densities are
+# binned into a bounded number of material sets. Each element points to the
+# section of its bin, so the model (and the input file) only contains
+# N_BINS materials and sections whatever the number of elements. The bin
+# sections are built by the optimizer, with the penalized stiffness of each bin.
+N_BINS = 32
+bin_densities = np.linspace(0.0, 1.0, N_BINS)
 
 # ==============================================================================
-# OPTIMIZATION PARAMETERS
+# PROBLEM (created once and re-analysed at every iteration)
 # ==============================================================================
-volfrac = 0.5  # Target volume fraction
-num_elements = len(prt.elements)
-densities = np.ones(num_elements) * volfrac  # Initial densities
-penalty = 3.0  # Penalization factor for SIMP
-move = 0.2  # Move limit
-tol = 1e-4  # Convergence tolerance for densities
-num_iterations = 100
+prb = mdl.add_problem(name="top_opt")
+stp = StaticStep(name="top_opt", system="SparseGeneral", test="NormDispIncr 1.0e-1 10")
+prb.add_step(stp)
+stp.combination = LoadCombination.SLS()
+
+# Apply load to the right edge
+loaded_nodes = [n for n in prt.nodes if abs(n.x - lx) < tol_x]
+load_value = -(1.0 / len(loaded_nodes)) * units.kN
+stp.add_uniform_node_load(nodes=loaded_nodes, z=load_value, load_case="LL")
+stp.add_output(StressFieldResults)
 
 
 # ==============================================================================
-# OPTIMALITY CRITERIA FUNCTION
+# ELEMENT NEIGHBOURHOOD
 # ==============================================================================
-def optimality_criteria_update(
-    densities, strain_energy_density, volfrac, penalty, move
-):
-    """
-    Update densities using the Optimality Criteria (OC) method without thresholds.
+# Neighbourhood matrices of each part: {radius: (signature, matrix)}. The
+# entries are dropped together with their parts.
+_NEIGHBOURHOODS = weakref.WeakKeyDictionary()
+
+
+def element_neighbourhood(part, radius):
+    """Sparse weights between the elements of a part within a radius.
+
+    The weights ``max(0, radius - d_ij)`` between the element centroids are
+    built once with a KD-tree and stored in CSR format. They are cached per part
+    and radius together with a hash of the element centroids and connectivity,
+    and rebuilt only when the mesh changes (nodes moved, added or removed,
+    elements added, removed or replaced), so they can be reused at every
+    iteration by density and sensitivity filters or for stress smoothing.
+
+    Parameters
+    ----------
+    part : :class:`compas_fea2.model.Part`
+    radius : float
+        The radius of the neighbourhood (in model units).
+
+    Returns
+    -------
+    scipy.sparse.csr_matrix
+        (n_elements, n_elements) weight matrix, in the order of ``part.elements``.
     """
-    l1, l2 = 0.0, np.sum(
-        strain_energy_density
-    )  # Dynamic bounds for Lagrange multiplier
-    target_vol = volfrac * len(densities)
-    oc_iter = 0
-    max_oc_iterations = 50
-
-    while (l2 - l1) > tol and oc_iter < max_oc_iterations:
-        lmid = 0.5 * (l1 + l2)
-
-        # Compute updated densities
-        sqrt_arg = lmid / strain_energy_density
-        ideal_densities = densities * np.sqrt(sqrt_arg)
-
-        # Apply move limit
-        new_densities = np.clip(
-            np.clip(ideal_densities, densities - move, densities + move), 0.0, 1.0
-        )
+    nodes = list(part.nodes)
+    elements = list(part.elements)
+    node_index = {node: i for i, node in enumerate(nodes)}
+    xyz = np.array([node.xyz for node in nodes])
+    connectivity = [[node_index[n] for n in e.nodes] for e in elements]
+    centroids = np.array([xyz[c].mean(axis=0) for c in connectivity])
+
+    digest = hashlib.sha1(centroids.tobytes())
+    for c in connectivity:
+        digest.update(np.array(c + [-1], dtype=np.int64).tobytes())
+    signature = digest.hexdigest()
+
+    cache = _NEIGHBOURHOODS.setdefault(part, {})
+    if radius in cache and cache[radius][0] == signature:
+        return cache[radius][1]
+
+    pairs = cKDTree(centroids).query_pairs(radius, output_type="ndarray")
+    d = np.linalg.norm(centroids[pairs[:, 0]] - centroids[pairs[:, 1]], axis=1)
+    n = len(elements)
+    H = coo_matrix((radius - d, (pairs[:, 0], pairs[:, 1])), shape=(n, n))
+    H = (H + H.T + radius * identity(n)).tocsr()
+    cache[radius] = (signature, H)
+    return H
 
-        # Evaluate current volume
-        current_vol = np.sum(new_densities)
-        if current_vol > target_vol:
-            l1 = lmid  # Too much volume, increase penalty
-        else:
-            l2 = lmid  # Too little volume, decrease penalty
 
-        oc_iter += 1
+# ==============================================================================
+# TOPOLOGY OPTIMIZER
+# ==============================================================================
+class TopologyOptimizer:
+    """SIMP topology optimization of a shell part.
+
+    The densities, the element volumes and the filter are stored as arrays,
+    so sensitivities, filtering and the optimality criteria (OC) update are
+    vectorized over all the elements. The same problem is re-analysed at every
+    iteration.
+
+    Parameters
+    ----------
+    part : :class:`compas_fea2.model.Part`
+        The part to optimize (triangular shell elements).
+    problem : :class:`compas_fea2.problem.Problem`
+        The problem to re-analyse at each iteration.
+    step : :class:`compas_fea2.problem.StaticStep`
+        The step of the problem with the stress field output.
+    volfrac : float
+        Target volume fraction.
+    penalty : float, optional
+        SIMP penalization exponent.
+    rmin : float, optional
+        Radius of the sensitivity filter (in model units).
+    move : float, optional
+        Move limit of the OC update.
+    rho_min : float, optional
+        Minimum density (to avoid a singular stiffness).
+    """
 
-    change = np.max(np.abs(new_densities - densities))
-    return new_densities, change
+    def __init__(self, part, problem, step, volfrac, penalty=3.0, rmin=60.0, move=0.2, rho_min=1e-3):
+        self.part = part
+        self.problem = problem
+        self.step = step
+        self.elements = list(part.elements)
+        self.volfrac = volfrac
+        self.penalty = penalty
+        self.move = move
+        self.rho_min = rho_min
+
+        node_index = {node: i for i, node in enumerate(part.nodes)}
+        self.xyz = np.array([node.xyz for node in part.nodes])
+        self.connectivity = np.array([[node_index[n] for n in e.nodes[:3]] for e in self.elements])
+        p = self.xyz[self.connectivity]
+        self.areas = 0.5 * np.linalg.norm(np.cross(p[:, 1] - p[:, 0], p[:, 2] - p[:, 0]), axis=1)
+        self.volumes = self.areas * thickness
+
+        self.H = element_neighbourhood(part, rmin)
+        self.Hs = np.asarray(self.H.sum(axis=1)).ravel()
+        self.densities = np.full(len(self.elements), volfrac)
+
+        # one material set per density bin, with the SIMP stiffness of the bin
+        self.bin_sections = [
+            ShellSection(
+                material=ElasticIsotropic(
+                    E=max(rho, rho_min) ** penalty * base_E * units("MPa"), v=0.2, density=7800 * units("kg/m**3")
+                ),
+                t=thickness * units.mm,
+            )
+            for rho in bin_densities
+        ]
+
+    def update_materials(self):
+        """Assign each element to the material set of its density bin."""
+        bins = np.rint(self.densities * (N_BINS - 1)).astype(int)
+        for element, b in zip(self.elements, bins):
+            element.section = self.bin_sections[b]
+        # densities actually seen by the analysis
+        self.effective_densities = np.maximum(bin_densities[bins], self.rho_min)
+
+    def strain_energies(self):
+        """Element strain energies from the mid-plane strain energy density."""
+        sed = np.zeros(len(self.elements))
+        for i, element in enumerate(self.elements):
+            try:
+                sed[i] = element.stress_results(self.step).mid_plane_stress_result.strain_energy_density
+            except (AttributeError, ValueError) as e:
+                print(f"Error extracting stress results for element {i}: {e}")
+        return np.maximum(sed, 0.0) * self.volumes
+
+    def sensitivities(self, energies):
+        """Filtered compliance sensitivities dc/drho (SIMP: -2 p U_e / rho_e)."""
+        dc = -2 * self.penalty * energies / self.effective_densities
+        return self.H @ (self.densities * dc) / (self.Hs * np.maximum(1e-3, self.densities))
+
+    def oc_update(self, dc):
+        """Optimality criteria update with bisection on the volume multiplier."""
+        rho = self.densities
+        target = self.volfrac * self.volumes.sum()
+        lower = np.maximum(self.rho_min, rho - self.move)
+        upper = np.minimum(1.0, rho + self.move)
+        l1, l2 = 0.0, 1e9
+        while (l2 - l1) / (l1 + l2) > 1e-4:
+            lmid = 0.5 * (l1 + l2)
+            new = np.clip(rho * np.sqrt(np.maximum(-dc, 0.0) / (lmid * self.volumes)), lower, upper)
+            if np.dot(new, self.volumes) > target:
+                l1 = lmid
+            else:
+                l2 = lmid
+        return new
+
+    def optimize(self, max_iterations=100, tol=1e-2):
+        """Run the optimization, yielding the metrics of every iteration."""
+        for i in range(max_iterations):
+            self.update_materials()
+            self.problem.analyse_and_extract(path=TEMP, erase_data=True, output=False)
+
+            energies = self.strain_energies()
+            compliance = 2 * energies.sum()
+            new = self.oc_update(self.sensitivities(energies))
+            change = np.abs(new - self.densities).max()
+            self.densities = new
+
+            yield {
+                "iteration": i + 1,
+                "compliance": compliance,
+                "volume_fraction": np.dot(self.densities, self.volumes) / self.volumes.sum(),
+                "change": change,
+            }
+            if change < tol:
+                break
 
 
 # ==============================================================================
 # OPTIMIZATION LOOP
 # ==============================================================================
-for i in range(num_iterations):
-    print("\n==========================")
-    print(f"Iteration {i+1}/{num_iterations}")
-    print("==========================")
-
-    # Create new problem & step
-    prb = mdl.add_problem(name=f"iter-{i}")
-    stp = StaticStep(
-        name=f"iter-{i}", system="SparseGeneral", test="NormDispIncr 1.0e-1 10"
-    )
-    prb.add_step(stp)
-    stp.combination = LoadCombination.SLS()
-
-    # Apply load to the right edge
-    loaded_nodes = [n for n in prt.nodes if abs(n.x - lx) < tol_x]
-    load_value = -(1.0 / len(loaded_nodes)) * units.kN
-    stp.add_uniform_node_load(nodes=loaded_nodes, z=load_value, load_case="LL")
-    stp.add_output(StressFieldResults)
-
-    # Update material properties based on current densities
-    for idx, element in enumerate(prt.elements):
-        element.section.material.E = densities[idx] ** penalty * base_E
-
-    # Perform FEA analysis
-    prb.analyse_and_extract(path=TEMP,  output=True)
-
-    # Extract & normalize strain energy density
-    strain_energy_density = np.zeros(num_elements)
-    for idx, element in enumerate(prt.elements):
-        try:
-            results = element.stress_results(stp)
-            mid_stress = results.mid_plane_stress_result
-            sed_val = max(
-                mid_stress.strain_energy_density, 1e-12
-            )  # Avoid division by zero
-            strain_energy_density[idx] = sed_val
-        except (AttributeError, ValueError) as e:
-            print(f"Error extracting stress results for element {idx}: {e}")
-            strain_energy_density[idx] = 1e-12
-
-    # Normalize SED to avoid unit-based inconsistencies
-    strain_energy_density /= np.max(strain_energy_density)
-
-    # Call the OC update
-    new_densities, change = optimality_criteria_update(
-        densities, strain_energy_density, volfrac, penalty, move
-    )
-    densities = new_densities
-
-    # Print iteration stats
-    print(f"Iteration {i+1}: Change in densities = {change:.4e}")
-    print(f"Iteration {i+1}: Volume fraction = {np.sum(densities) / num_elements:.3f}")
-
-    if change < tol:
-        print("Optimization converged.")
-        break
+optimizer = TopologyOptimizer(prt, prb, stp, volfrac=0.5, penalty=3.0, rmin=60.0, move=0.2)
+
+with open(os.path.join(TEMP, "top_opt_2d_history.csv"), "w", newline="") as f:
+    writer = csv.DictWriter(f, fieldnames=["iteration", "compliance", "volume_fraction", "change"])
+    writer.writeheader()
+    for metrics in optimizer.optimize(max_iterations=100, tol=1e-2):
+        writer.writerow(metrics)
+        f.flush()
+        print(
+            f"Iteration {metrics['iteration']}: compliance = {metrics['compliance']:.4e}, "
+            f"volume fraction = {metrics['volume_fraction']:.3f}, change = {metrics['change']:.4e}"
+        )
 
 # ==============================================================================
 # FINAL DENSITY PLOT
 # ==============================================================================
-plt.figure(figsize=(10, 6))
-plt.plot(range(len(densities)), densities, "bo-", label="Final Densities")
-plt.xlabel("Element Index")
-plt.ylabel("Density")
+plt.figure(figsize=(10, 4))
+plt.tripcolor(
+    optimizer.xyz[:, 0],
+    optimizer.xyz[:, 2],
+    optimizer.connectivity,
+    facecolors=optimizer.densities,
+    cmap="gray_r",
+    vmin=0,
+    vmax=1,
+)
+plt.gca().set_aspect("equal")
+plt.colorbar(label="Density")
 plt.title("Final Optimized Densities")
-plt.legend()
 plt.show()
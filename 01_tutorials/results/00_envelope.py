@@ -0,0 +1,268 @@
+"""
+Tutorial: Result envelopes over steps and combinations
+
+This tutorial shows how to compute max/min envelopes of displacements and
+reactions over several steps, load combinations and problems.
+The envelope is fed one step at a time: the field of each step is read from
+the results database straight into arrays, and the running extremes and the
+index of the governing step are stored in compact arrays (one row per node,
+one column per component).
+
+Each load arrangement is analysed in its own problem. With CalculiX (and
+Abaqus) the loads of a step are kept in the following steps of the same
+problem, so steps of one problem would not be independent load arrangements.
+
+Steps:
+1. Define a discretized portal frame.
+2. Define one problem per load arrangement and combination (ULS and SLS).
+3. Run the analyses.
+4. Stream the results of every step into the envelopes.
+5. Query the envelopes.
+"""
+
+import os
+import sqlite3
+from contextlib import closing
+
+import numpy as np
+from compas.geometry import Plane, Point, Line
+
+import compas_fea2
+from compas_fea2.model import Model, Part, BeamElement
+from compas_fea2.model import ElasticIsotropic, RectangularSection
+from compas_fea2.problem import (
+    Problem,
+    StaticStep,
+    LoadCombination,
+)
+from compas_fea2.results import DisplacementFieldResults, ReactionFieldResults
+from compas_fea2.units import units
+
+# Set the backend implementation
+# compas_fea2.set_backend("compas_fea2_opensees")
+compas_fea2.set_backend("compas_fea2_calculix")
+# compas_fea2.set_backend("compas_fea2_abaqus")
+# compas_fea2.set_backend("compas_fea2_castem")
+# compas_fea2.set_backend('compas_fea2_sofistik')
+
+compas_fea2.POINT_OVERLAP = False
+
+HERE = os.path.dirname(__file__)
+TEMP = os.path.join(HERE, "..", "..", "temp")
+
+units = units(system="SI_mm")
+
+
+# ==============================================================================
+# Envelope
+# ==============================================================================
+class Envelope:
+    """Running max/min envelope of a field result over many steps.
+
+    Parameters
+    ----------
+    field_name : str
+        Name of the field on the step (e.g. ``"displacement_field"``).
+    locations : list
+        The nodes (or elements) to envelope.
+    components : list[str], optional
+        The components of the results to track (names of the columns of the
+        field in the results database), by default all the components of the
+        field.
+
+    Notes
+    -----
+    The envelope keeps, for each location and component, the running extremes
+    and the index of the step that governs them. Steps are added one by one with
+    :meth:`add_step`, so the field results of a step can be discarded as soon as
+    they have been processed.
+    """
+
+    def __init__(self, field_name, locations, components=None):
+        self.field_name = field_name
+        self.locations = list(locations)
+        self.components = tuple(components) if components else None
+        self.steps = []
+        self.max = self.min = self.max_step = self.min_step = None
+
+        # keys of the locations of each part, sorted for the lookup of the rows
+        self._lookup = {}
+        parts = np.array([location.part.name for location in self.locations])
+        keys = np.array([location.key for location in self.locations], dtype=np.int64)
+        for part in np.unique(parts):
+            indices = np.flatnonzero(parts == part)
+            order = np.argsort(keys[indices])
+            self._lookup[str(part)] = (keys[indices][order], indices[order])
+
+    def _allocate(self, field):
+        if self.components is None:
+            self.components = tuple(field.components_names)
+        shape = (len(self.locations), len(self.components))
+        self.max = np.full(shape, -np.inf)
+        self.min = np.full(shape, np.inf)
+        self.max_step = np.full(shape, -1, dtype=np.int32)
+        self.min_step = np.full(shape, -1, dtype=np.int32)
+
+    def _step_values(self, step):
+        """Read the results of a step in a (n_locations, n_components) array.
+
+        The rows of the step are read from the results database with one query
+        per part and matched to the locations by key. Locations without a
+        result (e.g. free nodes in a reaction field) are returned as NaN and
+        never govern the envelope.
+        """
+        field = getattr(step, self.field_name)
+        if self.max is None:
+            self._allocate(field)
+        values = np.full(self.max.shape, np.nan)
+        columns = ", ".join(("key",) + self.components)
+        query = f"SELECT {columns} FROM {field.field_name} WHERE step = ? AND part = ?"
+        with closing(sqlite3.connect(step.problem.path_db)) as connection:
+            for part, (sorted_keys, indices) in self._lookup.items():
+                rows = connection.execute(query, (step.name, part)).fetchall()
+                if not rows:
+                    continue
+                data = np.asarray(rows, dtype=np.float64)
+                keys = data[:, 0].astype(np.int64)
+                pos = np.minimum(np.searchsorted(sorted_keys, keys), len(sorted_keys) - 1)
+                found = sorted_keys[pos] == keys
+                values[indices[pos[found]]] = data[found, 1:]
+        return values
+
+    def add_step(self, step):
+        """Update the envelope with the results of a step.
+
+        Parameters
+        ----------
+        step : :class:`compas_fea2.problem.Step`
+            An analysed step with the requested field in its outputs.
+        """
+        values = self._step_values(step)
+        index = len(self.steps)
+        self.steps.append(step)
+
+        # NaN comparisons are False, so missing results are skipped
+        is_max = values > self.max
+        is_min = values < self.min
+        self.max[is_max] = values[is_max]
+        self.min[is_min] = values[is_min]
+        self.max_step[is_max] = index
+        self.min_step[is_min] = index
+
+    def _component_index(self, component):
+        return self.components.index(component)
+
+    def get_max_result(self, component):
+        """Return the location, value and governing step of the maximum of a component."""
+        c = self._component_index(component)
+        i = int(np.nanargmax(np.where(self.max_step[:, c] >= 0, self.max[:, c], np.nan)))
+        return self.locations[i], self.max[i, c], self.steps[self.max_step[i, c]]
+
+    def get_min_result(self, component):
+        """Return the location, value and governing step of the minimum of a component."""
+        c = self._component_index(component)
+        i = int(np.nanargmin(np.where(self.min_step[:, c] >= 0, self.min[:, c], np.nan)))
+        return self.locations[i], self.min[i, c], self.steps[self.min_step[i, c]]
+
+    def get_limits_component(self, component):
+        """Return the minimum and maximum values of a component over all steps."""
+        return self.get_min_result(component)[1], self.get_max_result(component)[1]
+
+    def get_result_at(self, location):
+        """Return the envelope at a location as a dictionary of
+        ``component: (min, min_step, max, max_step)``."""
+        i = self.locations.index(location)
+        envelope = {}
+        for c, component in enumerate(self.components):
+            min_step = self.steps[self.min_step[i, c]] if self.min_step[i, c] >= 0 else None
+            max_step = self.steps[self.max_step[i, c]] if self.max_step[i, c] >= 0 else None
+            envelope[component] = (self.min[i, c], min_step, self.max[i, c], max_step)
+        return envelope
+
+
+# ==============================================================================
+# Model
+# ==============================================================================
+mdl = Model(name="portal_envelope")
+
+mat = ElasticIsotropic(
+    E=30 * units("GPa"),  # Young's modulus (30 GPa)
+    v=0.2,  # Poisson's ratio (dimensionless)
+    density=2400 * units("kg/m**3"),  # Density (2400 kg/m³)
+)
+sec = RectangularSection(w=20 * units.cm, h=50 * units.cm, material=mat)
+
+p1 = Point(0, 0, 0)
+p2 = Point(0, 0, 3000)
+p3 = Point(5000, 0, 3000)
+p4 = Point(5000, 0, 0)
+
+prt = Part.from_compas_lines_discretized(
+    lines=[Line(p1, p2), Line(p2, p3), Line(p3, p4)],
+    targetlength=500,
+    element_class=BeamElement,
+    section=sec,
+    frame=[0, 1, 0],
+    name="portal",
+)
+mdl.add_part(part=prt)
+mdl.add_fix_bc(nodes=prt.find_nodes_on_plane(Plane.worldXY()))
+
+# ==============================================================================
+# Problems: one problem (with one step) per load arrangement and combination
+# ==============================================================================
+beam_nodes = prt.find_nodes_on_plane(Plane([0, 0, 3000], [0, 0, 1]))
+corner_left = prt.find_closest_nodes_to_point(point=p2, number_of_nodes=1)
+corner_right = prt.find_closest_nodes_to_point(point=p3, number_of_nodes=1)
+
+# load arrangement: list of (nodes, load case, load components)
+arrangements = {
+    "gravity": [(beam_nodes, "DL", {"z": -2 * units.kN}), (beam_nodes, "LL", {"z": -3 * units.kN})],
+    "wind_left": [(beam_nodes, "DL", {"z": -2 * units.kN}), (corner_left, "LL", {"x": 10 * units.kN})],
+    "wind_right": [(beam_nodes, "DL", {"z": -2 * units.kN}), (corner_right, "LL", {"x": -10 * units.kN})],
+}
+
+problems = []
+for combination in (LoadCombination.ULS(), LoadCombination.SLS()):
+    for name, loads in arrangements.items():
+        prb = mdl.add_problem(problem=Problem(name=f"portal_{combination.name}_{name}"))
+        stp = prb.add_step(StaticStep(name=name))
+        stp.combination = combination
+        for nodes, load_case, components in loads:
+            stp.add_uniform_node_load(nodes=nodes, load_case=load_case, **components)
+        stp.add_outputs([DisplacementFieldResults, ReactionFieldResults])
+        problems.append(prb)
+
+mdl.analyse_and_extract(problems=problems, path=TEMP, verbose=True)
+
+# ==============================================================================
+# Envelopes: a single streaming pass over all steps of all problems
+# ==============================================================================
+nodes = list(prt.nodes)
+support_nodes = list(prt.find_nodes_on_plane(Plane.worldXY()))
+disp_envelope = Envelope("displacement_field", nodes)
+react_envelope = Envelope("reaction_field", support_nodes)
+
+for prb in problems:
+    for stp in prb.steps:
+        disp_envelope.add_step(stp)
+        react_envelope.add_step(stp)
+
+# components of the fields (columns of the results database): x is the first
+# and z the third
+for label, c in (("x", 0), ("z", 2)):
+    component = disp_envelope.components[c]
+    node, value, stp = disp_envelope.get_min_result(component)
+    print(f"Min displacement in {label} [mm]: {value:.3f} at node {node.key} ({stp.problem.name}/{stp.name})")
+    node, value, stp = disp_envelope.get_max_result(component)
+    print(f"Max displacement in {label} [mm]: {value:.3f} at node {node.key} ({stp.problem.name}/{stp.name})")
+
+for label, c in (("x", 0), ("z", 2)):
+    print(
+        f"Min/Max reaction forces in {label.upper()} direction [N]: ",
+        *react_envelope.get_limits_component(react_envelope.components[c]),
+    )
+
+# Envelope at a single support
+for component, (vmin, smin, vmax, smax) in react_envelope.get_result_at(support_nodes[0]).items():
+    print(f"Support {support_nodes[0].key} - {component}: min {vmin:.1f} ({smin.problem.name}), max {vmax:.1f} ({smax.problem.name})")
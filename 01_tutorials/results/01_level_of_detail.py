@@ -0,0 +1,203 @@
+"""
+Tutorial: Level-of-detail results for visualization
+
+Pushing the results of every node of a dense tetrahedral model into a viewer
+makes the interaction sluggish. This tutorial precomputes multi-resolution
+summaries of a displacement field once, and then draws only the level that
+matches the screen resolution.
+
+For each level of detail (LOD) we compute:
+- the surface-only subset of the nodes (internal nodes of a solid are never visible);
+- spatially decimated vector glyphs: one representative node (the one with the
+  largest displacement) per cell of a regular grid;
+- per-cell aggregated contour values (mean displacement magnitude).
+
+Steps:
+1. Build and analyse a refined solid plate.
+2. Extract the displacement field once into arrays.
+3. Precompute the LOD pyramid.
+4. Pick the level matching the screen resolution and draw it.
+"""
+
+import os
+from itertools import combinations
+from random import choice
+
+import numpy as np
+from compas.datastructures import Mesh
+from compas_gmsh.models import MeshModel
+from vedo import Arrows, Plotter, Points
+
+import compas_fea2
+from compas_fea2.model import Model, Part
+from compas_fea2.model import SolidSection, ElasticIsotropic
+from compas_fea2.problem import LoadCombination
+from compas_fea2.results import DisplacementFieldResults
+from compas_fea2.units import units
+
+units = units(system="SI_mm")
+
+# Set the backend implementation
+# compas_fea2.set_backend("compas_fea2_opensees")
+compas_fea2.set_backend("compas_fea2_calculix")
+# compas_fea2.set_backend("compas_fea2_abaqus")
+# compas_fea2.set_backend("compas_fea2_castem")
+# compas_fea2.set_backend('compas_fea2_sofistik')
+
+HERE = os.path.dirname(__file__)
+TEMP = os.path.join(HERE, "..", "..", "temp")
+
+# Screen resolution (in pixels) and approximate size of a glyph on screen
+SCREEN_PX = 1920
+GLYPH_PX = 25
+
+
+# ==============================================================================
+# Level-of-detail helpers
+# ==============================================================================
+def boundary_node_mask(part, node_index):
+    """Flag the nodes lying on the boundary of a solid part.
+
+    A face of a tetrahedron is on the boundary if it belongs to one element only.
+
+    Parameters
+    ----------
+    part : :class:`compas_fea2.model.Part`
+        A part made of 4-node tetrahedra.
+    node_index : dict
+        Map from node to its row in the result arrays.
+
+    Returns
+    -------
+    numpy.ndarray
+        Boolean mask, True for the boundary nodes.
+    """
+    tets = np.array([[node_index[n] for n in e.nodes[:4]] for e in part.elements])
+    faces = np.vstack([tets[:, list(f)] for f in combinations(range(4), 3)])
+    faces.sort(axis=1)
+    unique_faces, counts = np.unique(faces, axis=0, return_counts=True)
+    mask = np.zeros(len(node_index), dtype=bool)
+    mask[unique_faces[counts == 1].ravel()] = True
+    return mask
+
+
+def build_lod(xyz, vectors, levels=8):
+    """Precompute a pyramid of decimated glyphs and aggregated contour values.
+
+    Parameters
+    ----------
+    xyz : numpy.ndarray
+        (n, 3) coordinates of the nodes.
+    vectors : numpy.ndarray
+        (n, 3) result vectors at the nodes.
+    levels : int, optional
+        Number of levels; level ``k`` uses a grid of ``2**k`` cells along the
+        longest side of the bounding box.
+
+    Returns
+    -------
+    list[dict]
+        For each level: the cell size, the indices of the glyph nodes, the cell
+        centres and the mean magnitude of the vectors in each cell.
+    """
+    magnitude = np.linalg.norm(vectors, axis=1)
+    origin = xyz.min(axis=0)
+    extent = np.ptp(xyz, axis=0).max()
+
+    lod = []
+    for k in range(levels):
+        size = extent / 2**k
+        cells = np.floor((xyz - origin) / size).astype(np.int64)
+        _, labels = np.unique(cells, axis=0, return_inverse=True)
+        labels = labels.ravel()
+        n_cells = labels.max() + 1
+
+        # representative glyph: the node with the largest magnitude in each cell
+        order = np.lexsort((-magnitude, labels))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = labels[order][1:] != labels[order][:-1]
+
+        count = np.bincount(labels, minlength=n_cells)
+        centres = np.stack([np.bincount(labels, xyz[:, i], n_cells) for i in range(3)], axis=1) / count[:, None]
+        lod.append(
+            {
+                "cell_size": size,
+                "glyphs": order[first],
+                "centres": centres,
+                "values": np.bincount(labels, magnitude, n_cells) / count,
+            }
+        )
+    return lod
+
+
+def select_level(lod, screen_px=SCREEN_PX, glyph_px=GLYPH_PX):
+    """Return the coarsest level whose cells are not larger than a glyph on screen."""
+    extent = lod[0]["cell_size"]
+    target = extent * glyph_px / screen_px
+    for level in lod:
+        if level["cell_size"] <= target:
+            return level
+    return lod[-1]
+
+
+# ==============================================================================
+# Model and analysis
+# ==============================================================================
+lx = (10 * units.m).to_base_units().magnitude
+ly = (10 * units.m).to_base_units().magnitude
+mesh = Mesh.from_meshgrid(lx, 5, ly, 5)
+plate = mesh.thickened(100)
+poa = choice(list(set(mesh.vertices()) - set(mesh.vertices_on_boundary())))
+
+model = MeshModel.from_mesh(plate, targetlength=200)
+model.heal()
+model.generate_mesh(3)
+
+mdl = Model(name="lod_plate")
+mat = ElasticIsotropic(E=210 * units.GPa, v=0.2, density=7800 * units("kg/m**3"))
+prt = Part.from_gmsh(gmshModel=model, section=SolidSection(material=mat))
+mdl.add_part(prt)
+
+for vertex in mesh.vertices_where({"vertex_degree": 2}):
+    mdl.add_pin_bc(nodes=prt.find_closest_nodes_to_point(mesh.vertex_coordinates(vertex), 1, single=True))
+
+prb = mdl.add_problem(name="lod_plate")
+stp = prb.add_static_step()
+stp.combination = LoadCombination.SLS()
+stp.add_uniform_node_load(
+    nodes=prt.find_closest_nodes_to_point(mesh.vertex_coordinates(poa), 1, single=True),
+    z=-10 * units.kN,
+    load_case="LL",
+)
+stp.add_output(DisplacementFieldResults)
+
+mdl.analyse_and_extract(problems=[prb], path=TEMP, verbose=True)
+
+# ==============================================================================
+# Results to arrays (once) and LOD pyramid
+# ==============================================================================
+nodes = list(prt.nodes)
+node_index = {node: i for i, node in enumerate(nodes)}
+xyz = np.array([node.xyz for node in nodes])
+disp = stp.displacement_field
+vectors = np.array([[r.x, r.y, r.z] for r in map(disp.get_result_at, nodes)])
+
+surface = boundary_node_mask(prt, node_index)
+print(f"Surface nodes: {surface.sum()} of {len(nodes)}")
+
+lod = build_lod(xyz[surface], vectors[surface])
+for k, level in enumerate(lod):
+    print(f"LOD {k}: cell size {level['cell_size']:.1f} mm, {len(level['glyphs'])} glyphs")
+
+# ==============================================================================
+# Draw the level matching the screen resolution
+# ==============================================================================
+level = select_level(lod)
+sf = 1000
+start = xyz[surface][level["glyphs"]]
+end = start + sf * vectors[surface][level["glyphs"]]
+
+plotter = Plotter(title=f"{len(level['glyphs'])} glyphs, cell size {level['cell_size']:.1f} mm")
+plotter.add(Arrows(start, end).cmap("viridis", np.linalg.norm(end - start, axis=1) / sf))
+plotter.add(Points(level["centres"], r=6).cmap("viridis", level["values"]).add_scalarbar("|u| [mm]"))
+plotter.show()
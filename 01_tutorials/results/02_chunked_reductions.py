@@ -0,0 +1,171 @@
+"""
+Tutorial: Out-of-core post-processing of large field results
+
+The results of an analysis are extracted to a SQLite database. Loading a
+whole stress field of a large model in memory (one Python object per
+integration point) may not be possible. This tutorial reads the field in
+chunks of rows straight from the results database and computes sum, max,
+histogram and percentiles on top of the chunks, in bounded memory.
+
+Steps:
+1. Build and analyse a solid model.
+2. Iterate over the stress field in chunks.
+3. Compute the reductions (sum/mean, min/max, histogram, percentiles).
+"""
+
+import os
+import sqlite3
+from contextlib import closing
+
+import numpy as np
+
+import compas_fea2
+from compas_fea2.model import Model, Part
+from compas_fea2.model import SolidSection, Steel
+from compas_fea2.problem import LoadCombination
+from compas_fea2.results import StressFieldResults
+from compas_fea2.units import units
+
+units = units(system="SI_mm")
+
+# ==============================================================================
+# Define the data files
+# ==============================================================================
+HERE = os.path.dirname(__file__)
+DATA = os.path.join(HERE, "..", "..", "00_data", "solids")
+TEMP = os.path.join(HERE, "..", "..", "temp")
+
+# Set the backend implementation
+# compas_fea2.set_backend("compas_fea2_opensees")
+compas_fea2.set_backend("compas_fea2_calculix")
+# compas_fea2.set_backend("compas_fea2_abaqus")
+# compas_fea2.set_backend("compas_fea2_castem")
+# compas_fea2.set_backend('compas_fea2_sofistik')
+
+ROWS = 1_000_000
+STRESS_COMPONENTS = ["s11", "s22", "s33", "s12", "s13", "s23"]
+
+
+# ==============================================================================
+# Chunked iteration and reductions
+# ==============================================================================
+def iter_chunks(field, part, rows=ROWS, components=None):
+    """Iterate over the results of a field on a part in chunks of rows.
+
+    The rows are read from the results database of the problem with a single
+    query and fetched ``rows`` at a time, so at most one chunk is in memory.
+    The keys are only unique within a part, so the rows are filtered by part.
+
+    Parameters
+    ----------
+    field : :class:`compas_fea2.results.FieldResults`
+        The field to read (e.g. ``stp.stress_field``).
+    part : :class:`compas_fea2.model.Part`
+        The part of the locations.
+    rows : int, optional
+        Number of rows per chunk.
+    components : list[str], optional
+        The components to read, by default all the components of the field.
+
+    Yields
+    ------
+    tuple(numpy.ndarray, numpy.ndarray)
+        The keys of the locations (n,) and the values (n, n_components).
+    """
+    components = components or list(field.components_names)
+    columns = ", ".join(["key"] + components)
+    query = f"SELECT {columns} FROM {field.field_name} WHERE step = ? AND part = ?"
+    # closing() closes the connection also when the generator is abandoned
+    with closing(sqlite3.connect(field.problem.path_db)) as connection:
+        cursor = connection.execute(query, (field.step.name, part.name))
+        while True:
+            chunk = cursor.fetchmany(rows)
+            if not chunk:
+                break
+            data = np.asarray(chunk, dtype=np.float64)
+            yield data[:, 0].astype(np.int64), data[:, 1:]
+
+
+def von_mises(values):
+    """Von Mises stress from (n, 6) arrays of s11, s22, s33, s12, s13, s23."""
+    s11, s22, s33, s12, s13, s23 = values.T
+    return np.sqrt(
+        0.5 * ((s11 - s22) ** 2 + (s22 - s33) ** 2 + (s33 - s11) ** 2) + 3 * (s12**2 + s13**2 + s23**2)
+    )
+
+
+def chunked_stats(chunks, func=None):
+    """Count, sum, min and max (and their keys) of a quantity over all chunks."""
+    count, total = 0, 0.0
+    vmin, vmax = np.inf, -np.inf
+    kmin = kmax = None
+    for keys, values in chunks:
+        values = func(values) if func else values[:, 0]
+        count += len(values)
+        total += values.sum()
+        i, j = np.argmin(values), np.argmax(values)
+        if values[i] < vmin:
+            vmin, kmin = values[i], keys[i]
+        if values[j] > vmax:
+            vmax, kmax = values[j], keys[j]
+    return {"count": count, "sum": total, "mean": total / count, "min": (kmin, vmin), "max": (kmax, vmax)}
+
+
+def chunked_histogram(chunks, bins, func=None):
+    """Histogram of a quantity over all chunks with fixed bin edges."""
+    hist = np.zeros(len(bins) - 1, dtype=np.int64)
+    for _, values in chunks:
+        values = func(values) if func else values[:, 0]
+        hist += np.histogram(values, bins=bins)[0]
+    return hist
+
+
+def percentiles_from_histogram(hist, bins, q):
+    """Percentiles (0-100) interpolated linearly inside the histogram bins."""
+    cdf = np.concatenate([[0], np.cumsum(hist)]) / hist.sum()
+    return np.interp(np.asarray(q) / 100, cdf, bins)
+
+
+# ==============================================================================
+# Model and analysis
+# ==============================================================================
+mdl = Model(name="box_stress")
+mat_steel = Steel.S355(units=units)
+prt = Part.from_step_file(
+    step_file=os.path.join(DATA, "box.stp"),
+    section=SolidSection(material=mat_steel),
+    meshsize_max=50,
+)
+mdl.add_part(prt)
+mdl.add_pin_bc(nodes=mdl.find_nodes_on_plane(mdl.bottom_plane, tol=10))
+
+prb = mdl.add_problem(name="box_stress")
+stp = prb.add_static_step()
+stp.combination = LoadCombination.SLS()
+loaded_nodes = prt.find_nodes_on_plane(prt.top_plane, tol=10)
+stp.add_uniform_node_load(nodes=loaded_nodes, z=-100 * units.kN / len(loaded_nodes), load_case="LL")
+stp.add_output(StressFieldResults)
+
+prb.analyse_and_extract(path=TEMP, erase_data=True, output=True)
+
+# ==============================================================================
+# Reductions in bounded memory
+# ==============================================================================
+stress = stp.stress_field
+
+# first pass: count, sum, limits
+stats = chunked_stats(iter_chunks(stress, prt, components=STRESS_COMPONENTS), func=von_mises)
+print(f"Integration points: {stats['count']}")
+print(f"Mean von Mises stress [MPa]: {stats['mean']:.3f}")
+print(f"Min von Mises stress [MPa]: {stats['min'][1]:.3f} (element {stats['min'][0]})")
+print(f"Max von Mises stress [MPa]: {stats['max'][1]:.3f} (element {stats['max'][0]})")
+
+# second pass: histogram on the known range, then percentiles
+bins = np.linspace(stats["min"][1], stats["max"][1], 1001)
+hist = chunked_histogram(iter_chunks(stress, prt, components=STRESS_COMPONENTS), bins, func=von_mises)
+p50, p95, p99 = percentiles_from_histogram(hist, bins, [50, 95, 99])
+print(f"Percentiles of von Mises stress [MPa]: P50={p50:.3f}, P95={p95:.3f}, P99={p99:.3f}")
+
+# per-component limits of the normal stress s33, read on its own
+stats_s33 = chunked_stats(iter_chunks(stress, prt, components=["s33"]))
+print(f"Min/Max s33 [MPa]: {stats_s33['min'][1]:.3f} / {stats_s33['max'][1]:.3f}")
@@ -1,10 +1,111 @@
+import os
+import hashlib
+from functools import lru_cache
+
+import numpy as np
+
+import compas_fea2
 from compas_fea2.model import ISection, Steel
 
-isection = ISection.IPE160(material=Steel.S355())
+HERE = os.path.dirname(__file__)
+TEMP = os.path.join(HERE, "..", "..", "temp")
+os.makedirs(TEMP, exist_ok=True)
+
+STEEL = Steel.S355()
+
+isection = ISection.IPE160(material=STEEL)
 ishape = isection.shape.plot()
 
-isection = ISection.HEA200(material=Steel.S355())
+isection = ISection.HEA200(material=STEEL)
 ishape = isection.shape.plot()
 
-isection = ISection.HEB650(material=Steel.S355())
+isection = ISection.HEB650(material=STEEL)
 ishape = isection.shape.plot()
+
+
+# ==============================================================================
+# Indexed catalogue
+# ==============================================================================
+# The catalogue sections returned by the queries are constructed only when
+# they are needed and then memoized. Their properties are collected in a compact
+# table, so queries over the whole catalogue are vectorized searches that do
+# not rebuild any section. The table is built once per version of compas_fea2
+# and set of properties (the file name depends on both), reading each section
+# without keeping it in memory.
+FAMILIES = ("IPE", "HEA", "HEB")
+PROPERTIES = ("h", "w", "A", "Ixx", "Iyy", "J", "Wxx", "Wyy")
+CATALOGUE = os.path.join(
+    TEMP,
+    "isection_catalogue-{}-{}.npz".format(
+        compas_fea2.__version__, hashlib.sha1(repr(PROPERTIES).encode()).hexdigest()[:8]
+    ),
+)
+
+
+@lru_cache(maxsize=None)
+def catalogue_section(name, material=STEEL):
+    """Construct a catalogue section once and reuse it afterwards."""
+    return getattr(ISection, name)(material=material)
+
+
+@lru_cache(maxsize=1)
+def catalogue_table():
+    """The names and properties of all the catalogue sections.
+
+    Returns
+    -------
+    tuple(numpy.ndarray, dict)
+        The names of the sections and a dictionary of property arrays.
+    """
+    if os.path.exists(CATALOGUE):
+        data = np.load(CATALOGUE)
+        return data["names"], {p: data[p] for p in PROPERTIES}
+
+    names = np.array(sorted(n for n in dir(ISection) if n.startswith(FAMILIES) and n[3:].isdigit()))
+    rows = []
+    for name in names:
+        s = getattr(ISection, name)(material=STEEL)
+        rows.append([s.h, s.w, s.A, s.Ixx, s.Iyy, s.J, 2 * s.Ixx / s.h, 2 * s.Iyy / s.w])
+    table = dict(zip(PROPERTIES, np.array(rows, dtype=np.float64).T))
+    np.savez(CATALOGUE, names=names, **table)
+    return names, table
+
+
+def lightest_section(Ixx_min=0.0, Iyy_min=0.0, Wxx_min=0.0, h_max=np.inf, families=FAMILIES):
+    """Lightest catalogue section satisfying the given requirements.
+
+    Returns
+    -------
+    tuple(str, :class:`compas_fea2.model.ISection`) | None
+        The name and the section with the smallest area, or None if no section qualifies.
+    """
+    names, table = catalogue_table()
+    mask = (
+        (table["Ixx"] > Ixx_min)
+        & (table["Iyy"] > Iyy_min)
+        & (table["Wxx"] > Wxx_min)
+        & (table["h"] < h_max)
+        & np.isin(names.astype("U3"), families)
+    )
+    if not mask.any():
+        return None
+    candidates = np.flatnonzero(mask)
+    name = str(names[candidates[np.argmin(table["A"][candidates])]])
+    return name, catalogue_section(name)
+
+
+names, table = catalogue_table()
+print(f"Catalogue: {len(names)} sections")
+
+# Lightest section with Ixx > 2e7 mm^4 and h < 250 mm
+result = lightest_section(Ixx_min=2e7, h_max=250)
+if result is None:
+    print("No section with Ixx > 2e7 mm^4 and h < 250 mm")
+else:
+    name, section = result
+    print("Lightest section with Ixx > 2e7 mm^4 and h < 250 mm: ", name, section.A)
+
+# Member sizing loop: the table is reused, no section is reconstructed
+for Wxx_min in (1e5, 5e5, 1e6, 2e6):
+    result = lightest_section(Wxx_min=Wxx_min, families=("HEA", "HEB"))
+    print(f"Lightest HEA/HEB with Wxx > {Wxx_min:.0e} mm^3: ", result[0] if result else "none")
@@ -0,0 +1,140 @@
+from functools import lru_cache
+
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.path import Path
+
+from compas_fea2.model import Steel, AngleSection, ISection
+
+# Define the sections
+steel = Steel.S355()
+sections = {
+    "HEA280": ISection.HEA280(material=steel),
+    "L200x100x10": AngleSection(w=100, h=200, t1=10, t2=10, material=steel),
+}
+
+
+# ==============================================================================
+# Fiber discretization (computed once per section and cached)
+# ==============================================================================
+@lru_cache(maxsize=None)
+def fibers(section, n=200):
+    """Discretize the shape of a section into square fibers.
+
+    The bounding box of the shape is divided in a grid of ``n`` cells along
+    its longest side and the cells with the centre inside the shape are kept.
+    The integration matrix ``B`` maps the generalized strains of the section
+    (axial strain at the centroid, curvatures about x and y) to the strains
+    of the fibers: ``eps = B @ [e0, kx, ky]``.
+
+    Returns
+    -------
+    dict
+        ``xy`` (n_f, 2) fiber centres relative to the centroid, ``a`` (n_f,)
+        fiber areas and ``B`` (n_f, 3) integration matrix.
+    """
+    polygon = np.array([p[:2] for p in section.shape.points])
+    lo, hi = polygon.min(axis=0), polygon.max(axis=0)
+    size = (hi - lo).max() / n
+    gx, gy = np.meshgrid(np.arange(lo[0] + size / 2, hi[0], size), np.arange(lo[1] + size / 2, hi[1], size))
+    centres = np.column_stack([gx.ravel(), gy.ravel()])
+    centres = centres[Path(polygon).contains_points(centres)]
+
+    a = np.full(len(centres), size**2)
+    xy = centres - (a @ centres) / a.sum()
+    B = np.column_stack([np.ones(len(xy)), xy[:, 1], -xy[:, 0]])
+    return {"xy": xy, "a": a, "B": B}
+
+
+def properties(section):
+    """Area and second moments of area from the fibers."""
+    f = fibers(section)
+    x, y = f["xy"].T
+    return {"A": f["a"].sum(), "Ixx": f["a"] @ y**2, "Iyy": f["a"] @ x**2}
+
+
+def elastic_stress(section, N, Mx, My):
+    """Normal stress in the fibers for (arrays of) load sets, elastic material.
+
+    Returns
+    -------
+    numpy.ndarray
+        (m, n_f) stresses for m load sets.
+    """
+    f = fibers(section)
+    E = section.material.E
+    K = E * f["B"].T @ (f["a"][:, None] * f["B"])
+    loads = np.column_stack(np.broadcast_arrays(N, Mx, My)).reshape(-1, 3)
+    strains = np.linalg.solve(K, loads.T)  # (3, m)
+    return (E * f["B"] @ strains).T
+
+
+def moment_curvature(section, curvatures, N=0.0, iterations=50, tol=1e-8):
+    """Moment-curvature response about x with an elastic-perfectly plastic material.
+
+    The axial strain that balances ``N`` is found with Newton iterations run
+    on all the curvatures at the same time.
+
+    Returns
+    -------
+    numpy.ndarray
+        The moments Mx for each curvature.
+    """
+    f = fibers(section)
+    E, fy = section.material.E, section.material.fy
+    y, a = f["xy"][:, 1], f["a"]
+    k = np.asarray(curvatures, dtype=np.float64)[:, None]
+    e0 = np.zeros((len(k), 1))
+    for _ in range(iterations):
+        eps = e0 + k * y
+        sigma = np.clip(E * eps, -fy, fy)
+        residual = sigma @ a - N
+        tangent = (np.abs(E * eps) < fy) * E @ a
+        step = np.divide(residual, tangent, out=np.zeros_like(residual), where=tangent > 0)
+        e0 -= step[:, None]
+        if np.abs(residual).max() < tol * fy * a.sum():
+            break
+    sigma = np.clip(E * (e0 + k * y), -fy, fy)
+    return sigma @ (a * y)
+
+
+# ==============================================================================
+# Properties, stresses and moment-curvature
+# ==============================================================================
+N = -100e3
+Mx = 10e6
+My = 10e4
+
+for name, section in sections.items():
+    props = properties(section)
+    print(f"{name}: A = {props['A']:.1f} ({section.A:.1f}), Ixx = {props['Ixx']:.4e} ({section.Ixx:.4e}), Iyy = {props['Iyy']:.4e} ({section.Iyy:.4e})")
+
+section = sections["HEA280"]
+f = fibers(section)
+
+# Stresses for one load set
+sigma = elastic_stress(section, N, Mx, My)[0]
+plt.figure()
+plt.scatter(f["xy"][:, 0], f["xy"][:, 1], c=sigma, s=2, cmap="coolwarm")
+plt.gca().set_aspect("equal")
+plt.colorbar(label="Normal stress [MPa]")
+plt.title("Normal stress distribution")
+
+# Stresses for 10000 load sets in a single call, reusing the cached fibers
+rng = np.random.default_rng(0)
+loads = rng.uniform(-1, 1, (10000, 3)) * [N, Mx, My]
+sigma = elastic_stress(section, *loads.T)
+print("Max |sigma| over 10000 load sets [MPa]: ", np.abs(sigma).max())
+
+# Moment-curvature
+ky = section.material.fy / (section.material.E * section.h / 2)  # first yield curvature
+curvatures = np.linspace(0, 10 * ky, 200)
+moments = moment_curvature(section, curvatures)
+print(f"Plastic moment [kNm]: {moments[-1] / 1e6:.1f}")
+
+plt.figure()
+plt.plot(curvatures, moments / 1e6)
+plt.xlabel("Curvature [1/mm]")
+plt.ylabel("Moment [kNm]")
+plt.title("Moment-curvature")
+plt.show()
@@ -1,7 +1,9 @@
 import os
 from random import choice
 
+import numpy as np
 from compas.datastructures import Mesh
+from compas.geometry import Plane
 from compas_gmsh.models import MeshModel
 
 import compas_fea2
@@ -28,6 +30,135 @@ compas_fea2.set_backend("compas_fea2_calculix")
 HERE = os.path.dirname(__file__)
 TEMP = os.path.join(HERE, "..", "temp")
 
+# ==============================================================================
+# Cached boundary of a solid part
+# ==============================================================================
+# Outward faces of a positively oriented linear tetrahedron (local node indices)
+TET_FACES = np.array([[0, 2, 1], [0, 1, 3], [1, 2, 3], [0, 3, 2]])
+
+
+class PartBoundary:
+    """Boundary of a solid part, computed once from the element connectivity.
+
+    The boundary faces are the faces of the tetrahedra that are not shared by
+    two elements, found with a single ``np.unique`` on all the faces. They,
+    the bounding box, the top/bottom planes, the faces lying on them and the
+    boundary meshes are cached on the instance. The cache is cleared when the
+    number of nodes or of elements of the part changes; call
+    :meth:`invalidate` after moving nodes or replacing elements.
+
+    Parameters
+    ----------
+    part : :class:`compas_fea2.model.Part`
+        A part meshed with linear tetrahedra.
+    """
+
+    def __init__(self, part):
+        self.part = part
+        self._cache = {}
+        self._version = None
+
+    def _check_version(self):
+        version = (len(self.part.nodes), len(self.part.elements))
+        if version != self._version:
+            self._cache.clear()
+            self._version = version
+
+    def _get(self, name, compute):
+        self._check_version()
+        if name not in self._cache:
+            self._cache[name] = compute()
+        return self._cache[name]
+
+    def invalidate(self):
+        """Discard all the cached values (e.g. after moving nodes)."""
+        self._cache.clear()
+        self._version = None
+
+    @property
+    def nodes(self):
+        """The nodes of the part, in the order used by the arrays."""
+        return self._get("nodes", lambda: list(self.part.nodes))
+
+    @property
+    def xyz(self):
+        """(n, 3) coordinates of the nodes."""
+        return self._get("xyz", lambda: np.array([node.xyz for node in self.nodes], dtype=np.float64))
+
+    @property
+    def faces(self):
+        """(m, 3) node indices of the outward boundary faces."""
+
+        def compute():
+            node_index = {node: i for i, node in enumerate(self.nodes)}
+            connectivity = np.array([[node_index[n] for n in e.nodes[:4]] for e in self.part.elements])
+            # flip the negatively oriented tetrahedra, so all the faces point outwards
+            p = self.xyz[connectivity]
+            volumes = np.einsum("ij,ij->i", p[:, 1] - p[:, 0], np.cross(p[:, 2] - p[:, 0], p[:, 3] - p[:, 0]))
+            connectivity[volumes < 0] = connectivity[volumes < 0][:, [0, 2, 1, 3]]
+            faces = connectivity[:, TET_FACES].reshape(-1, 3)
+            _, inverse, counts = np.unique(np.sort(faces, axis=1), axis=0, return_inverse=True, return_counts=True)
+            return faces[counts[inverse.ravel()] == 1]
+
+        return self._get("faces", compute)
+
+    @property
+    def bounding_box(self):
+        """(2, 3) minimum and maximum coordinates of the nodes."""
+        return self._get("bounding_box", lambda: np.array([self.xyz.min(axis=0), self.xyz.max(axis=0)]))
+
+    @property
+    def top_plane(self):
+        """Horizontal plane at the top of the bounding box."""
+        return self._get("top_plane", lambda: Plane([0, 0, self.bounding_box[1, 2]], [0, 0, 1]))
+
+    @property
+    def bottom_plane(self):
+        """Horizontal plane at the bottom of the bounding box."""
+        return self._get("bottom_plane", lambda: Plane([0, 0, self.bounding_box[0, 2]], [0, 0, -1]))
+
+    def _faces_at(self, z, tol):
+        return self.faces[np.all(np.abs(self.xyz[self.faces, 2] - z) < tol, axis=1)]
+
+    def top_faces(self, tol=1e-3):
+        """Boundary faces on the top plane."""
+        return self._get(("top_faces", tol), lambda: self._faces_at(self.bounding_box[1, 2], tol))
+
+    def bottom_faces(self, tol=1e-3):
+        """Boundary faces on the bottom plane."""
+        return self._get(("bottom_faces", tol), lambda: self._faces_at(self.bounding_box[0, 2], tol))
+
+    @property
+    def mesh(self):
+        """The discretized boundary mesh, built from the boundary faces."""
+
+        def compute():
+            used, local = np.unique(self.faces, return_inverse=True)
+            return Mesh.from_vertices_and_faces(self.xyz[used].tolist(), local.reshape(-1, 3).tolist())
+
+        return self._get("mesh", compute)
+
+    @property
+    def boundary_mesh(self):
+        """The boundary mesh of the geometry, by default the discretized one."""
+        return self._get("boundary_mesh", lambda: self.mesh)
+
+    def set_meshes(self, boundary_mesh=None, discretized_boundary_mesh=None):
+        """Use meshes already available and pass them to the part.
+
+        The meshes are cached like the computed ones (until the part changes).
+        The part reads its boundary meshes from private attributes, which are
+        only set here.
+        """
+        self._check_version()
+        if boundary_mesh is not None:
+            self._cache["boundary_mesh"] = boundary_mesh
+        if discretized_boundary_mesh is not None:
+            self._cache["mesh"] = discretized_boundary_mesh
+        self.part._boundary_mesh = self.boundary_mesh
+        self.part._discretized_boundary_mesh = self.mesh
+
+
 # ==============================================================================
 # Make a plate mesh
 # ==============================================================================
@@ -76,10 +207,14 @@ sec = SolidSection(material=mat)
 
 # Convert the gmsh model in a compas_fea2 Part
 prt = Part.from_gmsh(gmshModel=model, section=sec)
-prt._boundary_mesh = plate
-prt._discretized_boundary_mesh = solid_mesh
+boundary = PartBoundary(prt)
+boundary.set_meshes(boundary_mesh=plate)
 mdl.add_part(prt)
 
+print("Boundary faces: ", len(boundary.faces))
+print("Bounding box: ", boundary.bounding_box.tolist())
+print("Top/bottom faces: ", len(boundary.top_faces()), "/", len(boundary.bottom_faces()))
+
 # Set boundary conditions in the corners
 for vertex in mesh.vertices_where({"vertex_degree": 2}):
     location = mesh.vertex_coordinates(vertex)
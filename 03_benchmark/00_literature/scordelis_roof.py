@@ -1,5 +1,6 @@
 import os
 import gmsh
+import numpy as np
 from math import radians, cos, sin
 from compas.geometry import Plane
 import compas_fea2
@@ -41,7 +42,7 @@ theta = 40  # Angle in degrees
 t = 250  # Thickness in mm
 n_angle = 20  # Mesh divisions along the curve
 n_span = 20  # Mesh divisions along the span
-q = -900 * 47.8803  # Uniform load in N/m^2 (converted to N/mm^2)
+q = (90 * 47.8803 * units.Pa).to_base_units().magnitude  # Self-weight: 90 lb/ft^2 (converted to N/mm^2)
 
 # Create points on the curved surface
 angle_divisions = [radians(theta) * i / (n_angle - 1) for i in range(n_angle)]
@@ -99,6 +100,44 @@ def nodes_from_gmsh(node_tags, node_coords):
     return nodes
 
 
+def surface_nodal_loads(xyz, faces, pressure, direction=None):
+    """Lump a surface load on triangular faces to the nodes.
+
+    For linear triangles the consistent nodal loads of a uniform traction are
+    one third of the face resultant at each vertex, so the distribution is
+    computed in one pass over the face areas and normals.
+
+    Parameters
+    ----------
+    xyz : numpy.ndarray
+        (n, 3) node coordinates.
+    faces : numpy.ndarray
+        (m, 3) node indices of the triangles.
+    pressure : float | numpy.ndarray
+        Load per unit area, uniform or one value per face.
+    direction : list[float], optional
+        Global direction of the load (e.g. [0, 0, -1] for self-weight).
+        If not given, the load acts along the face normals.
+
+    Returns
+    -------
+    numpy.ndarray
+        (n, 3) nodal forces.
+    """
+    a, b, c = xyz[faces[:, 0]], xyz[faces[:, 1]], xyz[faces[:, 2]]
+    area_normals = 0.5 * np.cross(b - a, c - a)  # |n| = face area
+    pressure = np.broadcast_to(np.asarray(pressure, dtype=np.float64), (len(faces),))
+    if direction is None:
+        resultants = pressure[:, None] * area_normals
+    else:
+        areas = np.linalg.norm(area_normals, axis=1)
+        resultants = (pressure * areas)[:, None] * np.asarray(direction, dtype=np.float64)
+    loads = np.zeros((len(xyz), 3))
+    for i in range(3):
+        np.add.at(loads, faces[:, i], resultants / 3)
+    return loads
+
+
 def elements_from_gmsh(element_tags, element_node_tags, nodes, section):
     elements = []
     for i in range(len(element_tags)):
@@ -147,12 +186,23 @@ step.add_outputs([DisplacementFieldResults, ReactionFieldResults])
 # --------------------------------------------------------------------------
 # Loading
 # --------------------------------------------------------------------------
-# Apply uniform load to the surface
+# Apply the self-weight per unit area of the roof surface
 step.combination = LoadCombination.ULS()
-area_roof = 1
-step.add_uniform_node_load(nodes=part.nodes, load_case="LL", x=0, y=0, z=-q*area_roof/len(part.nodes) * units.kN)
-# polygon=
-# step.add_area_load(polygon, load_case=None, x=None, y=None, z=None, xx=None, yy=None, zz=None, axes="global")
+xyz = np.asarray(node_coords, dtype=np.float64).reshape(-1, 3)
+tags = np.asarray(node_tags)
+tag_order = np.argsort(tags)
+faces = tag_order[np.searchsorted(tags, np.asarray(element_node_tags).reshape(-1, 3), sorter=tag_order)]
+nodal_loads = surface_nodal_loads(xyz, faces, q, direction=[0, 0, -1])
+
+# Nodes with the same load are loaded together (unloaded nodes are skipped)
+roof_nodes = list(gmsh_nodes.values())
+values, groups = np.unique(np.round(nodal_loads, 6), axis=0, return_inverse=True)
+groups = groups.ravel()
+members = np.split(np.argsort(groups, kind="stable"), np.cumsum(np.bincount(groups))[:-1])
+for (x, y, z), group in zip(values, members):
+    if x or y or z:
+        step.add_uniform_node_load(nodes=[roof_nodes[i] for i in group], load_case="LL", x=x, y=y, z=z)
+print(f"Total applied load [N]: {nodal_loads[:, 2].sum():.1f}")
 
 
 # Run analysis